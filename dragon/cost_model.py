@@ -1,7 +1,42 @@
 import numpy as np
+
+from powers import PowerTerms
+
 # Constants
 P = 12  # $ per kg for food
 
+# Cost scenarios: each is a full parameter set for the cost functions below
+COST_SCENARIOS = {
+    'baseline': {
+        'P': P,             # $ per kg for food
+        'c_move': 80000,    # USD, one-time infrastructure move
+        'I_move': 0,        # 1 if relocation this month, else 0
+        'c_deliv': 0.5,     # USD/kg, feed delivery cost
+        'c_sup': 400,       # USD/staff·month, training & medical supplies
+        'b_keeper': 0.4,
+        'b_vet': 0.25,
+        'c_pat': 1000,      # USD per km of ground patrol per month
+        'L_ring': 390,      # km, perimeter length of the protected area
+        'c_drone': 500,     # USD per flight hour
+        'h_drone': 40,      # hours of drone/helicopter flight per month
+        'c_handle': 2,      # USD per kg of caribou
+    },
+    'low': {
+        'P': 7,
+        'c_move': 50000,
+        'I_move': 0.004,
+        'c_deliv': 0.3,
+        'c_sup': 250,
+        'b_keeper': 0.3,
+        'b_vet': 0.15,
+        'c_pat': 600,
+        'L_ring': 390,
+        'c_drone': 300,
+        'h_drone': 25,
+        'c_handle': 1,
+    },
+}
+
 # -----------------------------
 # 1. Food Cost
 # -----------------------------
@@ -17,59 +52,50 @@ def caloric(M):
 #     F_M = np.asarray(caloric1(M))
 #     return (F_M - H) * P
 
-def cost_food_vec(food_vec):
-    return P * np.asarray(food_vec)
+def cost_food_vec(food_vec, scenario='baseline'):
+    return COST_SCENARIOS[scenario]['P'] * np.asarray(food_vec)
 
 
-def cost_people_vec(M):
+def cost_people_vec(M, scenario='baseline'):
     """
     Vectorized monthly people cost.
     """
     M = np.asarray(M)
     return (1 / 12) * (100000 * (M / 40) ** 0.3 + 120000 * (M / 10) ** 0.15) * 1.08
 
-def cost_logistics_vec_phase1(M):
+def cost_logistics_vec_phase1(M, scenario='baseline'):
     M = np.asarray(M)
-    
+
     # Constants
-    c_move = 80000      # USD, one-time infrastructure move
-    I_move = 0          # 1 if relocation this month, else 0
-    c_deliv = 0.5       # USD/kg, feed delivery cost
-    c_sup = 400         # USD/staff·month, training & medical supplies
-    b_keeper = 0.4
-    b_vet = 0.25
-    
+    s = COST_SCENARIOS[scenario]
+
     F_M = np.asarray(caloric1(M))
-    
-    n_staff = 5 * (M / 10) ** b_keeper + (M / 10) ** b_vet
-    
+
+    n_staff = 5 * (M / 10) ** s['b_keeper'] + (M / 10) ** s['b_vet']
+
     # Cost components
-    move_cost = c_move * I_move
-    delivery_cost = c_deliv * F_M
-    supply_cost = c_sup * n_staff
-    
+    move_cost = s['c_move'] * s['I_move']
+    delivery_cost = s['c_deliv'] * F_M
+    supply_cost = s['c_sup'] * n_staff
+
     # Total monthly logistics cost
     return move_cost + delivery_cost + supply_cost
 
-def cost_logistics_open_vec_phase2(M):
+def cost_logistics_open_vec_phase2(M, scenario='baseline'):
     M = np.asarray(M)
 
-    c_pat = 1000        # USD per km of ground patrol per month
-    L_ring = 390         # km, perimeter length of the protected area
-    c_drone = 500       # USD per flight hour
-    h_drone = 40        # hours of drone/helicopter flight per month
-    c_handle = 2        # USD per kg of caribou
-    
+    s = COST_SCENARIOS[scenario]
+
     F_M = np.asarray(caloric1(M))
-    
-    patrol_cost = c_pat * L_ring
-    drone_cost = c_drone * h_drone
-    handling_cost = c_handle * np.minimum(F_M, H)
-    
+
+    patrol_cost = s['c_pat'] * s['L_ring']
+    drone_cost = s['c_drone'] * s['h_drone']
+    handling_cost = s['c_handle'] * np.minimum(F_M, H)
+
     return patrol_cost + drone_cost + handling_cost
-    
 
-def cost_space_vec(M):
+
+def cost_space_vec(M, scenario='baseline'):
     M = np.asarray(M)
     land = (M / 10) * 4000
     env_facility = (1 / 12) * 8000 * (M / 10) ** 0.3
@@ -79,6 +105,45 @@ def cost_space_vec(M):
 def caloric1(M):
     return 50 * np.power(M, 0.75)
 
+
+def cost_components(M, food, extra_food, p1_mask, p2_mask, scenarios=('baseline',), powers=None):
+    """
+    Fused evaluation of every cost component over a (trials x months) mass matrix.
+    Each power-law term is computed once and shared by all components and scenarios
+    (pass powers=powers.mass_powers(M) to reuse cached terms across calls);
+    returns {scenario: {'p1_food', ..., 'p2_space'}} of per-trial (masked) sums.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    power = PowerTerms(M) if powers is None else powers
+
+    def masked_sum(values, mask):
+        return np.where(mask, values, 0).sum(axis=1)
+
+    F_M = 50 * power(1, 0.75)
+    people = (1 / 12) * (100000 * power(40, 0.3) + 120000 * power(10, 0.15)) * 1.08
+    space = (M / 10) * 4000 + (1 / 12) * 8000 * power(10, 0.3) + 1200 * power(10, 0.8)
+    people_p1, people_p2 = masked_sum(people, p1_mask), masked_sum(people, p2_mask)
+    space_p1, space_p2 = masked_sum(space, p1_mask), masked_sum(space, p2_mask)
+    food_p1, food_p2 = masked_sum(food, p1_mask), masked_sum(extra_food, p2_mask)
+
+    out = {}
+    for scenario in scenarios:
+        s = COST_SCENARIOS[scenario]
+        n_staff = 5 * power(10, s['b_keeper']) + power(10, s['b_vet'])
+        logistics_p1 = s['c_move'] * s['I_move'] + s['c_deliv'] * F_M + s['c_sup'] * n_staff
+        logistics_p2 = s['c_pat'] * s['L_ring'] + s['c_drone'] * s['h_drone'] + s['c_handle'] * np.minimum(F_M, H)
+        out[scenario] = {
+            'p1_food': s['P'] * food_p1,
+            'p1_people': people_p1,
+            'p1_logistics': masked_sum(logistics_p1, p1_mask),
+            'p1_space': space_p1,
+            'p2_food': s['P'] * food_p2,
+            'p2_people': people_p2,
+            'p2_logistics': masked_sum(logistics_p2, p2_mask),
+            'p2_space': space_p2,
+        }
+    return out
+
 # Baseline harvesting level
 H = 100
 
@@ -93,7 +158,7 @@ H = 100
 if __name__ == "__main__":
     M = np.array([10, 20, 50, 100, 200])  # example dragon masses (kg)
 
-    print("Food cost ($/month):", cost_food_vec(M, caloric1, H))
+    print("Food cost ($/month):", cost_food_vec(caloric1(M)))
     print("People cost ($/month):", cost_people_vec(M))
 
     # Logistics – Phase 1 (Zoo)
@@ -102,4 +167,4 @@ if __name__ == "__main__":
     # Logistics – Phase 2 (Open Area)
     print("Logistics cost – Phase 2 (Open) ($/month):", cost_logistics_open_vec_phase2(M))
 
-    print("Space cost ($/month):", cost_space_vec(M))
\ No newline at end of file
+    print("Space cost ($/month):", cost_space_vec(M))
@@ -1,12 +1,16 @@
 import numpy as np
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import tabulate
 import matplotlib.pyplot as plt
 
 from mass_model import mass_model
-from prey_model import prey_model, get_max_harvest
-from cost_model import cost_food_vec, cost_people_vec, cost_logistics_vec_phase1, cost_logistics_open_vec_phase2, cost_space_vec
-# from cost_model_low import cost_food_vec, cost_people_vec, cost_logistics_vec_phase1, cost_logistics_open_vec_phase2, cost_space_vec
+from prey_model import PreyModel
+from sim_log import SimLog, LOG_FORMATS
+from results_store import save_results, STORE_FORMATS
+from stats import StreamSummary
+from cost_model import cost_components, COST_SCENARIOS
+from powers import POWER_CACHE, mass_powers
 
 
 DRAGON_CNT = 3
@@ -20,7 +24,7 @@ MAX_KG_P2 = 200000000000
 KG_PER_CARIBOU = 45
 
 
-def _parse_args():
+def _parse_args(argv=None):
 	parser = argparse.ArgumentParser()
 	parser.add_argument('--n', type=int, default=50, help='number of trials to run model')
 	parser.add_argument('--t', type=int, default=120, help='number of months')
@@ -33,11 +37,51 @@ def _parse_args():
 	parser.add_argument('--k', type=float, default=20000, help='caribou population carrying capacity')
 	parser.add_argument('--pr', type=float, default=0.317, help='annual caribou population growth rate')
 	parser.add_argument('--plot', action="store_true")
-	return parser.parse_args()
-
-
-def calculate_rer(cur_mass):
-	return 70 * np.power(cur_mass, 0.75)
+	parser.add_argument('--g1', type=float, default=GROWTH_RATE_1, help='monthly dragon mass growth rate for the first 48 months')
+	parser.add_argument('--g2', type=float, default=GROWTH_RATE_2, help='monthly dragon mass growth rate after 48 months')
+	parser.add_argument('--prey', choices=['closed', 'ode'], default='closed', help='closed: analytic monthly caribou step, ode: solve_ivp every month (reference)')
+	parser.add_argument('--seed', type=int, default=42, help='random seed (vec engine: root of the per-trial SeedSequence)')
+	parser.add_argument('--workers', type=int, default=1, help='number of processes to shard trials across (fast / vec engines; loop is serial only)')
+	parser.add_argument('--log', type=str, default='log.txt', help='path of the run log')
+	parser.add_argument('--log-format', choices=LOG_FORMATS, default='text', help='run log format')
+	parser.add_argument('--log-summary', action="store_true", help='log one "too big" summary per trial instead of every month')
+	parser.add_argument('--out-format', choices=('txt',) + STORE_FORMATS, default='txt', help='txt: tabulate report only, npz/npy/parquet: columnar results store')
+	parser.add_argument('--out', type=str, default=None, help='results store path (default results.npz / results_npy / results_parquet)')
+	parser.add_argument('--report', action="store_true", help='also render results.txt when writing a results store')
+	parser.add_argument('--stream', action="store_true", help='fold trials into running summary statistics in chunks instead of keeping every trajectory (fast / vec engines)')
+	parser.add_argument('--chunk', type=int, default=500, help='trials per chunk in --stream mode')
+	parser.add_argument('--keep', type=int, default=0, help='full trajectories to keep (reservoir sample) in --stream mode')
+	parser.add_argument('--quantiles', type=float, nargs='+', default=[0.05, 0.5, 0.95], help='quantiles to estimate in --stream mode')
+	parser.add_argument('--cost', choices=list(COST_SCENARIOS), default='baseline', help='cost scenario (parameter set in cost_model.COST_SCENARIOS)')
+	parser.add_argument('--power-cache', type=int, default=32, help='max mass vectors kept in the power-law term cache')
+	parser.add_argument('--power-cache-mb', type=float, default=256, help='max megabytes held by the power-law term cache')
+	parser.add_argument('--engine', choices=['fast', 'vec', 'loop'], default='fast', help='fast: closed-form phase 1 + array phase 2, vec: all trials in lockstep as arrays, loop: one trial at a time (reference, serial only)')
+	args = parser.parse_args(argv)
+	if args.engine == 'loop' and args.workers > 1:
+		parser.error('--engine loop runs serially, it cannot be combined with --workers')
+	if args.engine == 'loop' and args.stream:
+		parser.error('--engine loop keeps every trajectory, it cannot be combined with --stream')
+	return args
+
+
+def calculate_rer(cur_mass, mass_pow=None):
+	# mass_pow: precomputed cur_mass ** 0.75
+	return 70 * (np.power(cur_mass, 0.75) if mass_pow is None else mass_pow)
+
+
+def food_for_fire_days(
+		cur_mass, 	# current dragon mass (scalar or array of trials)
+		fire_days,	# fire days this month (same shape as cur_mass)
+		food_prop = 0.5,	# average proportion of food to feed dragon (0~1)
+		d = 30,     # days in a month
+		mass_pow = None,	# precomputed cur_mass ** 0.75
+	):
+	if mass_pow is None:
+		mass_pow = np.power(cur_mass, 0.75)
+	cur_rer = (d + fire_days) * calculate_rer(cur_mass, mass_pow)		# rer (cal) for cur month
+	min_food = cur_rer / CAL_PER_KG  # kg
+	max_food = (d + fire_days) * CAL_COEFF * mass_pow  # kg
+	return min_food + food_prop * (max_food - min_food)
 
 
 def calculate_monthly_food(
@@ -48,53 +92,34 @@ def calculate_monthly_food(
 	):
 	# Here, food_prop = 0 means dragon is fed rer (minimum calories to survive) --> assumed to not grow
 	fire_days = np.random.poisson(lam)
-	cur_rer = (d + fire_days) * calculate_rer(cur_mass)		# rer (cal) for cur month
-	min_food = cur_rer / CAL_PER_KG  # kg
-	max_food = (d + fire_days) * CAL_COEFF * np.power(cur_mass, 0.75)  # kg
-	new_food = min_food + food_prop * (max_food - min_food)
+	new_food = food_for_fire_days(cur_mass, fire_days, food_prop=food_prop, d=d)
 	return new_food, fire_days
 
 
-def mass_model(
-		args
-		# n = 50,     # trial number
-		# t = 120,    # number of months to run model
-		# d = 30,     # days in a month
-		# lam = 4,    # average number of fire days per month
-		# f = 0.5,	# average proportion of food to feed dragon (0~1)
-		# m_0 = 10,   # initial dragon mass
-		# phase2 = False,
-	):
-	
+def _new_result(n, t):
+	# per-trial series, month-aligned: phase 2 months are flagged in 'phase2'
+	return {
+		'mass': np.zeros((n, t + 1)),		# start-of-month mass, last column is final mass
+		'food': np.zeros((n, t)),
+		'fire': np.zeros((n, t), dtype=np.int64),
+		'phase2': np.zeros((n, t), dtype=bool),
+		'cari_pop': np.zeros((n, t)),
+		'cari_add': np.zeros((n, t)),
+		'residual': np.zeros((n, t)),		# caribou over max harvest ("too big" months)
+	}
+
+
+def simulate_loop(args, log):
+	'''reference engine: runs each trial month by month'''
 	# unpack args
 	n, t, d, lam, f, m_0 = args.n, args.t, args.tm, args.fire, args.f, args.m0
 	phase2 = args.phase2
-	p_init, pK, pr = args.p0, args.k, args.pr
-	plot_caribou = args.plot
-
-
-	all_p1_mass_list = []
-	all_p1_food_list = []
-	all_p1_fire_list = []
-	all_p1_food_cost = []
-	all_p1_empl_cost = []
-	all_p1_logi_cost = []
-	all_p1_spac_cost = []
-
-	all_p2_mass_list = []
-	all_p2_food_list = []
-	all_p2_fire_list = []
-	all_p2_cari_pop_list = []
-	all_p2_cari_add_list = []
-	all_p2_food_cost = []
-	all_p2_empl_cost = []
-	all_p2_logi_cost = []
-	all_p2_spac_cost = []
-
-	# reset log
-	with open('log.txt', 'w', encoding='utf-8') as file:
-		file.write("")
-	
+	p_init = args.p0
+	prey_mode = args.prey
+	prey = PreyModel(r=args.pr, K=args.k)
+
+	result = _new_result(n, t)
+
 	# run trials
 	for trial in range(n):
 		p1_mass_list = []
@@ -139,7 +164,7 @@ def mass_model(
 				p1_fire_list.append(cur_fire)
 
 				# update mass based on food_prop
-				growth_rate = GROWTH_RATE_1 if month < 48 else GROWTH_RATE_2
+				growth_rate = args.g1 if month < 48 else args.g2
 				mass_growth = 1 + food_prop_p1 * (growth_rate - 1)
 				cur_mass *= mass_growth
 			else:
@@ -153,12 +178,11 @@ def mass_model(
 				cari_to_add = 0
 
 				# dragon needs too much food
-				residual = p_harvest - get_max_harvest()
+				residual = p_harvest - prey.max_harvest()
 				if residual > 0:
 					# log
-					with open('log.txt', 'a', encoding='utf-8') as file:
-						file.write(f"Trial {trial}, Month {month}: Dragon got too big, required food exceeded maximum harvest - Limiting dragon food intake\n")
-						file.write(f"Requires {residual} more caribou to return it to max harvest to avoid extinction\n")
+					log.too_big(trial, month, residual)
+					result['residual'][trial, month] = residual
 					# add more caribou
 					cari_to_add += residual
 				
@@ -168,9 +192,9 @@ def mass_model(
 				p2_fire_list.append(cur_fire)
 
 				if residual > 0:
-					harvest_results = prey_model(pop_caribou, get_max_harvest())
+					harvest_results = prey.step(pop_caribou, prey.max_harvest(), mode=prey_mode)
 				else:
-					harvest_results = prey_model(pop_caribou, p_harvest)
+					harvest_results = prey.step(pop_caribou, p_harvest, mode=prey_mode)
 				p2_cari_pop_list.append(harvest_results['p_next'])
 
 				# update caribou pop
@@ -183,83 +207,271 @@ def mass_model(
 				
 				# update mass based on food_prop
 				if cur_mass < MAX_KG_P2:
-					growth_rate = GROWTH_RATE_1 if month < 48 else GROWTH_RATE_2
+					growth_rate = args.g1 if month < 48 else args.g2
 					mass_growth = 1 + food_prop_p2 * (growth_rate - 1)
 					cur_mass *= mass_growth
 				p2_cari_add_list.append(cari_to_add)
-		
-		# appending trial result
+
+		# store trial result (phase 1 months first, then phase 2 months)
+		s = len(p1_mass_list)
+		result['mass'][trial, :s] = p1_mass_list
+		result['mass'][trial, s:t] = p2_mass_list
+		result['mass'][trial, t] = cur_mass
+		result['food'][trial, :s] = p1_food_list
+		result['food'][trial, s:] = p2_food_list
+		result['fire'][trial, :s] = p1_fire_list
+		result['fire'][trial, s:] = p2_fire_list
+		result['phase2'][trial, s:] = True
+		result['cari_pop'][trial, s:] = p2_cari_pop_list
+		result['cari_add'][trial, s:] = p2_cari_add_list
+
+	return result
+
+
+def trial_fire_days(seed, trials, t, lam):
+	'''fire days (len(trials), t), each trial drawn from its own SeedSequence-spawned generator'''
+	fire = np.empty((len(trials), t), dtype=np.int64)
+	for row, trial in enumerate(trials):
+		rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(trial),)))
+		fire[row] = rng.poisson(lam, size=t)
+	return fire
+
+
+def _caribou_month(result, idx, month, cur_food, pop_caribou, prey, prey_mode):
+	'''PHASE 2 caribou step for trials idx, records the month and returns their next population'''
+	# compare food req (kg) of all 3 dragons with max caribou harvest
+	max_harvest = prey.max_harvest()
+	p_harvest = np.floor(cur_food * DRAGON_CNT / KG_PER_CARIBOU)  # round down
+	residual = p_harvest - max_harvest
+	too_big = residual > 0
+	harvest = np.where(too_big, max_harvest, p_harvest)
+	cari_to_add = np.where(too_big, residual, 0)
+	result['residual'][idx, month] = cari_to_add
+
+	harvest_results = prey.step(pop_caribou, harvest, mode=prey_mode)
+	p_next, p_min = harvest_results['p_next'], harvest_results['p_min']
+	result['cari_pop'][idx, month] = p_next
+
+	# overharvesting --> re-add caribou
+	over = p_next < p_min
+	result['cari_add'][idx, month] = cari_to_add + np.where(over, p_min - p_next, 0)
+	return np.where(over, p_min, p_next)
+
+
+def mass_trajectory(args):
+	'''closed-form start-of-month mass (t + 1,), monthly food proportion (t,) and phase 2 switch month;
+	mass growth never depends on the fire days, so this is shared by every trial'''
+	t, f = args.t, args.f
+	# cumulative product multiplies in the same order as the monthly loop --> bit-identical masses
+	factors = np.where(np.arange(t) < 48, 1 + f * (args.g1 - 1), 1 + f * (args.g2 - 1))
+	uncapped = np.cumprod(np.concatenate(([float(args.m0)], factors)))
+
+	# phase 1 only: mass is capped (food_prop = 0) from the first month it starts at MAX_KG_P1
+	# phase 2: growth stops from the first month it starts at MAX_KG_P2
+	over = np.flatnonzero(uncapped[:t] >= (MAX_KG_P2 if args.phase2 else MAX_KG_P1))
+	capped_from = over[0] if len(over) else t
+	mass = uncapped.copy()
+	mass[capped_from + 1:] = uncapped[capped_from]
+
+	food_prop = np.full(t, f, dtype=np.float64)
+	switch = t
+	if args.phase2:
+		switched = np.flatnonzero(mass[:t] >= MAX_KG_P1)
+		switch = switched[0] if len(switched) else t
+	else:
+		food_prop[capped_from:] = 0
+	return mass, food_prop, switch
+
+
+def simulate_fast(args, trials=None, fire=None):
+	'''phase 1 fast path: mass and food for every trial come from the closed-form mass trajectory
+	and one (n, t) fire matrix; only the phase 2 caribou step runs month by month'''
+	trials = np.arange(args.n) if trials is None else trials
+	n, t = len(trials), args.t
+	prey = PreyModel(r=args.pr, K=args.k)
+	if fire is None:
+		fire = trial_fire_days(args.seed, trials, t, args.fire)
+
+	mass, food_prop, switch = mass_trajectory(args)
+	mass_pow = POWER_CACHE.terms(mass)(1, 0.75)
+
+	result = _new_result(n, t)
+	result['mass'][:] = mass
+	result['food'][:] = food_for_fire_days(mass[:t], fire, food_prop=food_prop, d=args.tm, mass_pow=mass_pow[:t])
+	result['fire'][:] = fire
+	result['phase2'][:, switch:] = True
+
+	pop_caribou = np.full(n, args.p0, dtype=np.float64)
+	idx = np.arange(n)
+	for month in range(switch, t):
+		pop_caribou = _caribou_month(result, idx, month, result['food'][:, month], pop_caribou, prey, args.prey)
+	return result
+
+
+def simulate(args, trials=None, fire=None):
+	'''runs the array engine selected by args.engine ('fast' or 'vec')'''
+	if args.engine == 'fast':
+		return simulate_fast(args, trials, fire)
+	if args.engine == 'vec':
+		return simulate_vec(args, trials, fire)
+	raise ValueError(f"Engine {args.engine} has no array form, expected one of ('fast', 'vec')")
+
+
+def simulate_vec(args, trials=None, fire=None):
+	'''advances every trial in lockstep, one month at a time, as arrays of shape (n,);
+	fire (len(trials), t) can be passed in to reuse draws across runs'''
+	# unpack args
+	trials = np.arange(args.n) if trials is None else trials
+	n, t, d, lam, f, m_0 = len(trials), args.t, args.tm, args.fire, args.f, args.m0
+	phase2 = args.phase2
+	p_init = args.p0
+	prey_mode = args.prey
+	prey = PreyModel(r=args.pr, K=args.k)
+
+	result = _new_result(n, t)
+
+	cur_mass = np.full(n, m_0, dtype=np.float64)
+	pop_caribou = np.full(n, p_init, dtype=np.float64)
+	in_phase2 = np.zeros(n, dtype=bool)
+	if fire is None:
+		fire = trial_fire_days(args.seed, trials, t, lam)
+
+	for month in range(t):
+		# DRAGON MASS SECTION
+		capped = cur_mass >= MAX_KG_P1
 		if phase2:
-			# final padding
-			p2_mass_list.append(cur_mass)
-			p2_food_list.append(0)
-			p2_fire_list.append(0)
-			p2_cari_pop_list.append(0)
-			p2_cari_add_list.append(0)
-
-			# append trials
-			all_p1_mass_list.append(p1_mass_list)
-			all_p1_food_list.append(p1_food_list)
-			all_p1_fire_list.append(p1_fire_list)
-
-			all_p2_mass_list.append(p2_mass_list)
-			all_p2_food_list.append(p2_food_list)
-			all_p2_fire_list.append(p2_fire_list)
-			all_p2_cari_pop_list.append(p2_cari_pop_list)
-			all_p2_cari_add_list.append(p2_cari_add_list)
-		
+			# switch capped trials to phase 2
+			in_phase2 |= capped
+			food_prop = np.full(n, f, dtype=np.float64)
 		else:
-			# final padding
-			p1_mass_list.append(cur_mass)
-			p1_food_list.append(0)
-			p1_fire_list.append(0)
-
-			# append trials
-			all_p1_mass_list.append(p1_mass_list)
-			all_p1_food_list.append(p1_food_list)
-			all_p1_fire_list.append(p1_fire_list)
-	
-		# compute costs
-		# all_p1_food_cost = []
-		# all_p1_empl_cost = []
-		# all_p1_logi_cost = []
-		# all_p1_spac_cost = []
-
-		all_p1_food_cost.append(list(cost_food_vec(p1_food_list)))
-		all_p1_empl_cost.append(list(cost_people_vec(p1_mass_list)))
-		all_p1_logi_cost.append(list(cost_logistics_vec_phase1(p1_mass_list)))
-		all_p1_spac_cost.append(list(cost_space_vec(p1_mass_list)))
-
-		p2_extra_food_list = np.asarray(p2_cari_add_list) * KG_PER_CARIBOU
-		all_p2_food_cost.append(list(cost_food_vec(p2_extra_food_list)))
-		all_p2_empl_cost.append(list(cost_people_vec(p2_mass_list)))
-		all_p2_logi_cost.append(list(cost_logistics_open_vec_phase2(p2_mass_list)))
-		all_p2_spac_cost.append(list(cost_space_vec(p2_mass_list)))
-	
+			# cap dragon mass
+			food_prop = np.where(capped, 0, f)
+
+		fire_days = fire[:, month]
+		cur_food = food_for_fire_days(cur_mass, fire_days, food_prop=food_prop, d=d)
+
+		result['mass'][:, month] = cur_mass
+		result['food'][:, month] = cur_food
+		result['fire'][:, month] = fire_days
+		result['phase2'][:, month] = in_phase2
+
+		if in_phase2.any():
+			idx = np.flatnonzero(in_phase2)
+			pop_caribou[idx] = _caribou_month(result, idx, month, cur_food[idx], pop_caribou[idx], prey, prey_mode)
+
+		# update mass based on food_prop (phase 2 growth stops at MAX_KG_P2)
+		growth_rate = args.g1 if month < 48 else args.g2
+		grow = ~in_phase2 | (cur_mass < MAX_KG_P2)
+		cur_mass = np.where(grow, cur_mass * (1 + food_prop * (growth_rate - 1)), cur_mass)
+
+	result['mass'][:, t] = cur_mass
+	return result
+
+
+def _simulate_shard(args, trials):
+	POWER_CACHE.resize(args.power_cache, args.power_cache_mb)
+	result = simulate(args, trials)
+	return result, compute_costs(result, args.phase2, args.cost)
+
+
+def simulate_parallel(args):
+	'''shards trials across a process pool and merges the per-trial arrays in trial order'''
+	shards = [trials for trials in np.array_split(np.arange(args.n), args.workers) if len(trials)]
+	with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+		parts = list(pool.map(_simulate_shard, [args] * len(shards), shards))
+	result = {key: np.concatenate([part[0][key] for part in parts]) for key in parts[0][0]}
+	costs = {key: np.concatenate([part[1][key] for part in parts]) for key in parts[0][1]}
+	return result, costs
+
+
+def phase_masks(result, phase2):
+	'''masks over the (n, t + 1) padded layout selecting each phase's reported months'''
+	n = result['phase2'].shape[0]
+	p1_mask = np.hstack([~result['phase2'], np.full((n, 1), not phase2)])
+	p2_mask = np.hstack([result['phase2'], np.full((n, 1), phase2)])
+	return p1_mask, p2_mask
+
+
+def padded_series(result):
+	'''series with the final padding month (final mass, zeros elsewhere) appended'''
+	n = result['phase2'].shape[0]
+	pad = np.zeros((n, 1))
+	return {
+		'mass': result['mass'],
+		'food': np.hstack([result['food'], pad]),
+		'fire': np.hstack([result['fire'], pad.astype(np.int64)]),
+		'cari_pop': np.hstack([result['cari_pop'], pad]),
+		'cari_add': np.hstack([result['cari_add'], pad]),
+	}
+
+
+def simulate_stream(args, log):
+	'''runs trials in chunks and folds each chunk into a StreamSummary, dropping its raw series'''
+	chunks = np.array_split(np.arange(args.n), max(1, -(-args.n // args.chunk)))
+	summary = StreamSummary(args.t, quantiles=args.quantiles, keep=args.keep, seed=args.seed)
+	if args.workers > 1:
+		pool = ProcessPoolExecutor(max_workers=args.workers)
+		parts = pool.map(_simulate_shard, [args] * len(chunks), chunks)
+	else:
+		pool = None
+		parts = (_simulate_shard(args, trials) for trials in chunks)
+	for trials, (result, costs) in zip(chunks, parts):
+		log.residuals(result['residual'], first_trial=int(trials[0]))
+		summary.fold(result, costs)
+		del result, costs
+	if pool is not None:
+		pool.shutdown()
+	return summary
+
+
+def price_scenarios(result, phase2, scenarios=('baseline',)):
+	'''per-trial cost totals, shape (n,), for each phase and category, under every cost scenario'''
+	p1_mask, p2_mask = phase_masks(result, phase2)
+	series = padded_series(result)
+	p2_extra_food = series['cari_add'] * KG_PER_CARIBOU
+	powers = mass_powers(series['mass'])
+	return cost_components(series['mass'], series['food'], p2_extra_food, p1_mask, p2_mask, scenarios=scenarios, powers=powers)
+
+
+def compute_costs(result, phase2, scenario='baseline'):
+	'''per-trial monthly cost totals, shape (n,), for each phase and category'''
+	return price_scenarios(result, phase2, scenarios=(scenario,))[scenario]
+
+
+def phase_totals(costs):
+	'''per-trial (phase 1, phase 2) totals for all dragons, as reported in results.txt'''
+	p1_total = DRAGON_CNT * (costs['p1_food'] + costs['p1_people'] + costs['p1_logistics'] + costs['p1_space'])
+	p2_total = costs['p2_food'] + DRAGON_CNT * (costs['p2_people'] + costs['p2_logistics'])
+	return p1_total, p2_total
+
+
+def write_results(result, costs, phase2, plot_caribou=False):
+	p1_mask, p2_mask = phase_masks(result, phase2)
+	series = padded_series(result)
+
+	def trial_series(key, mask, trial):
+		return series[key][trial][mask[trial]].tolist()
+
 	# print results from all trials
-	trial_cnt = len(all_p1_mass_list)
+	trial_cnt = len(result['mass'])
 	trial_data_1 = []
-	max_month_cnt = 0
-	for trial in range(trial_cnt):
-		max_month_cnt = max(max_month_cnt, len(all_p1_mass_list[trial]))
+	max_month_cnt = int(p1_mask.sum(axis=1).max())
 	
 	trial_costs = []
-	trial_costs_detailed = []
 
 	for trial in range(trial_cnt):
-		p1_mass_list = all_p1_mass_list[trial]
-		p1_food_list = all_p1_food_list[trial]
-		p1_fire_list = all_p1_fire_list[trial]
+		p1_mass_list = trial_series('mass', p1_mask, trial)
+		p1_food_list = trial_series('food', p1_mask, trial)
+		p1_fire_list = trial_series('fire', p1_mask, trial)
 
-		total_cost = DRAGON_CNT * (sum(all_p1_food_cost[trial]) + sum(all_p1_empl_cost[trial]) + sum(all_p1_logi_cost[trial]) + sum(all_p1_spac_cost[trial]))
-		trial_costs.append(total_cost)
 		costs_breakdown = {
-			'food': sum(all_p1_food_cost[trial]),
-			'people': sum(all_p1_empl_cost[trial]),
-			'logistics': sum(all_p1_logi_cost[trial]), 
-			'space': sum(all_p1_spac_cost[trial]),
+			'food': costs['p1_food'][trial],
+			'people': costs['p1_people'][trial],
+			'logistics': costs['p1_logistics'][trial], 
+			'space': costs['p1_space'][trial],
 		}
-		trial_costs_detailed.append(costs_breakdown)
+		total_cost = DRAGON_CNT * (costs_breakdown['food'] + costs_breakdown['people'] + costs_breakdown['logistics'] + costs_breakdown['space'])
+		trial_costs.append(total_cost)
 
 		trial_data_1.append(([trial + 1, 'Mass'] + p1_mass_list + [0] * max_month_cnt)[:max_month_cnt + 3] + [total_cost, costs_breakdown['logistics']])
 		trial_data_1.append(([trial + 1, 'Food'] + p1_food_list + [0] * max_month_cnt)[:max_month_cnt + 3] + [costs_breakdown['food'], costs_breakdown['space']])
@@ -273,31 +485,27 @@ def mass_model(
 	if phase2:
 		specific_food = {603: [], 756: [], 959: [], 1112: [], 1200: []}
 
-		trial_cnt = len(all_p2_mass_list)
 		trial_data_2 = []
-		max_month_cnt2 = 0
-		for trial in range(trial_cnt):
-			max_month_cnt2 = max(max_month_cnt2, len(all_p2_mass_list[trial]))
-			if trial < 5:
-				for idx in specific_food:
-					specific_food[idx].append(float(all_p2_food_list[trial][idx - max_month_cnt]))
+		max_month_cnt2 = int(p2_mask.sum(axis=1).max())
+		for trial in range(min(trial_cnt, 5)):
+			p2_food_list = trial_series('food', p2_mask, trial)
+			for idx in specific_food:
+				specific_food[idx].append(float(p2_food_list[idx - max_month_cnt]))
 		print(specific_food)
 
-		trial_costs_detailed = []
-
 		for trial in range(trial_cnt):
-			p2_mass_list = all_p2_mass_list[trial]
-			p2_food_list = all_p2_food_list[trial]
-			p2_fire_list = all_p2_fire_list[trial]
-			p2_cari_pop_list = all_p2_cari_pop_list[trial]
-			p2_cari_add_list = all_p2_cari_add_list[trial]
+			p2_mass_list = trial_series('mass', p2_mask, trial)
+			p2_food_list = trial_series('food', p2_mask, trial)
+			p2_fire_list = trial_series('fire', p2_mask, trial)
+			p2_cari_pop_list = trial_series('cari_pop', p2_mask, trial)
+			p2_cari_add_list = trial_series('cari_add', p2_mask, trial)
 
-			total_cost = sum(all_p2_food_cost[trial]) + DRAGON_CNT * (sum(all_p2_empl_cost[trial]) + sum(all_p2_logi_cost[trial]))
 			costs_breakdown = {
-				'food': sum(all_p2_food_cost[trial]),
-				'people': sum(all_p2_empl_cost[trial]),
-				'logistics': sum(all_p2_logi_cost[trial])
+				'food': costs['p2_food'][trial],
+				'people': costs['p2_people'][trial],
+				'logistics': costs['p2_logistics'][trial],
 			}
+			total_cost = costs_breakdown['food'] + DRAGON_CNT * (costs_breakdown['people'] + costs_breakdown['logistics'])
 
 			final_cost = trial_costs[trial] + total_cost
 
@@ -320,16 +528,56 @@ def mass_model(
 			plt.ylabel("Caribous to Add")
 			x_data = list(range(max_month_cnt, max_month_cnt + max_month_cnt2))[:-1]
 			for trial in range(trial_cnt):
-				y_data = all_p2_cari_add_list[trial][:-1]
+				y_data = trial_series('cari_add', p2_mask, trial)[:-1]
 				plt.plot(x_data, y_data, linestyle='-', color='grey', alpha=0.5)
 			plt.tight_layout()
 			plt.show()
 
+
+def mass_model(
+		args
+		# n = 50,     # trial number
+		# t = 120,    # number of months to run model
+		# d = 30,     # days in a month
+		# lam = 4,    # average number of fire days per month
+		# f = 0.5,	# average proportion of food to feed dragon (0~1)
+		# m_0 = 10,   # initial dragon mass
+		# phase2 = False,
+	):
+	if args.stream:
+		with SimLog(args.log, fmt=args.log_format, summary=args.log_summary) as log:
+			summary = simulate_stream(args, log)
+		path = summary.save(args.out if args.out is not None else 'summary.npz')
+		stats = summary.summary()
+		rows = [
+			[key, stats[f"cost_{key}_mean"], np.sqrt(stats[f"cost_{key}_var"]), stats[f"cost_{key}_min"], stats[f"cost_{key}_max"]] + list(stats[f"cost_{key}_q"])
+			for key in summary.costs
+		]
+		print(tabulate.tabulate(rows, headers=['Cost', 'Mean', 'Std', 'Min', 'Max'] + [f"q{q:g}" for q in summary.quantiles], floatfmt=".1f"))
+		print(f"Summary of {args.n} trials written to {path}")
+		return summary
+
+	with SimLog(args.log, fmt=args.log_format, summary=args.log_summary) as log:
+		if args.engine == 'loop':
+			result = simulate_loop(args, log)
+			costs = compute_costs(result, args.phase2, args.cost)
+		else:
+			if args.workers > 1:
+				result, costs = simulate_parallel(args)
+			else:
+				result, costs = _simulate_shard(args, np.arange(args.n))
+			log.residuals(result['residual'])
+	if args.out_format == 'txt' or args.report:
+		write_results(result, costs, args.phase2, plot_caribou=args.plot)
+	if args.out_format != 'txt':
+		save_results(result, costs, vars(args), path=args.out, fmt=args.out_format)
+	return result, costs
+
 	
 if __name__ == "__main__":
-	np.random.seed(42)
-
 	args = _parse_args()
+	np.random.seed(args.seed)
+
 	mass_model(args)
 	# mass_model(
 	# 	n = args.n,         # number of trials
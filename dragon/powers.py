@@ -0,0 +1,111 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PowerTerms:
+	'''Power-law terms (M / divisor) ** exponent of one mass array, each computed on first use.
+
+	Covers every term of the food and cost models: M^0.75 (rer, max food, caloric1),
+	(M/40)^0.3 (people), (M/10)^0.15, ^0.3, ^0.8 (people, space) and the staffing
+	exponents of each cost scenario.
+	'''
+
+	def __init__(self, M):
+		self.M = M
+		self.terms = {}
+
+	def __call__(self, divisor, exponent):
+		key = (divisor, exponent)
+		if key not in self.terms:
+			self.terms[key] = np.power(self.M, exponent) if divisor == 1 else (self.M / divisor) ** exponent
+		return self.terms[key]
+
+	@property
+	def nbytes(self):
+		return self.M.nbytes + sum(term.nbytes for term in self.terms.values())
+
+
+class ExpandedTerms:
+	'''PowerTerms of the unique rows of a mass matrix (or of its single row, 1-D), expanded back to every row on access'''
+
+	def __init__(self, terms, inverse=None):
+		self.terms = terms
+		self.inverse = inverse
+
+	def __call__(self, divisor, exponent):
+		values = self.terms(divisor, exponent)
+		if values.ndim == 1:
+			values = values[None]
+		return values if self.inverse is None else values[self.inverse]
+
+
+class PowerCache:
+	'''Bounded LRU cache of PowerTerms keyed by the contents of the mass array.
+
+	Entries are evicted least recently used first once there are more than max_entries
+	of them or they hold more than max_mb megabytes of arrays.
+	'''
+
+	def __init__(self, max_entries=32, max_mb=256):
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.resize(max_entries, max_mb)
+
+	def resize(self, max_entries=None, max_mb=None):
+		if max_entries is not None:
+			self.max_entries = max_entries
+		if max_mb is not None:
+			self.max_bytes = max_mb * 2 ** 20
+		self._evict()
+
+	def clear(self):
+		self.entries.clear()
+
+	@staticmethod
+	def _key(M):
+		return (M.shape, M.dtype.str, hashlib.blake2b(np.ascontiguousarray(M).view(np.uint8), digest_size=16).digest())
+
+	def _evict(self, keep=None):
+		nbytes = sum(terms.nbytes for terms in self.entries.values())
+		while self.entries and (len(self.entries) > self.max_entries or nbytes > self.max_bytes):
+			key = next(iter(self.entries))
+			if key == keep:
+				break
+			nbytes -= self.entries.pop(key).nbytes
+
+	def terms(self, M):
+		M = np.asarray(M, dtype=np.float64)
+		key = self._key(M)
+		if key in self.entries:
+			self.hits += 1
+			self.entries.move_to_end(key)
+		else:
+			self.misses += 1
+			self.entries[key] = PowerTerms(M)
+		# terms fill in lazily, so sizes are re-checked on every access
+		self._evict(keep=key)
+		return self.entries[key]
+
+
+# shared by the food and cost computations of a process
+POWER_CACHE = PowerCache()
+
+
+def unique_rows(M):
+	'''(unique rows, inverse) of a 2-D array; inverse is None for a single row'''
+	if len(M) == 0 or (M == M[0]).all():
+		# a copy, so the cached terms do not keep the whole matrix alive
+		return M[:1].copy(), (np.zeros(len(M), dtype=np.intp) if len(M) > 1 else None)
+	rows, inverse = np.unique(M, axis=0, return_inverse=True)
+	return rows, inverse.reshape(-1)
+
+
+def mass_powers(M, cache=POWER_CACHE):
+	'''power-law terms of a (trials x months) mass matrix, computed once per unique mass vector;
+	a single unique row is cached as the 1-D mass trajectory, the same entry the food computation uses'''
+	M = np.asarray(M, dtype=np.float64)
+	rows, inverse = unique_rows(M)
+	return ExpandedTerms(cache.terms(rows[0] if len(rows) == 1 else rows), inverse)
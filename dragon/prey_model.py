@@ -15,22 +15,85 @@ t_span = (0, 50)  # simulate 50 months
 t_eval = np.linspace(*t_span, 500)
 
 
+class PreyModel:
+    '''Caribou population under logistic growth with a constant monthly harvest.
+
+    Each instance carries its own r, K and harvest, so separate simulations (threads,
+    processes, trials) never share mutable state.
+    '''
+
+    def __init__(self, r=r, K=K, harvest=H):
+        self.r = r
+        self.K = K
+        self.harvest = harvest
+
+    def rate(self, t, p, harvest_amt=None):
+        '''differential equation dx/dt'''
+        harvest_amt = self.harvest if harvest_amt is None else harvest_amt
+        return self.r * p * (1 - p / self.K) - harvest_amt
+
+    def max_harvest(self):
+        return self.rate(0, self.K / 2, 0)
+
+    def fixed_pts(self, harvest_amt=None):
+        harvest_amt = self.harvest if harvest_amt is None else harvest_amt
+        # check whether harvest is too high
+        if np.any(np.asarray(harvest_amt) > self.r * self.K / 4):
+            raise ValueError("Harvesting rate too high, definite extinction")
+        root = np.sqrt(np.maximum(self.K ** 2 - 4 * self.K * np.asarray(harvest_amt, dtype=np.float64) / self.r, 0))
+        p_min = (self.K - root) / 2
+        p_max = (self.K + root) / 2
+        return p_min, p_max
+
+    def solve(self, x0, harvest_amt=None, t_span=t_span, t_eval=t_eval):
+        harvest_amt = self.harvest if harvest_amt is None else harvest_amt
+        return solve_ivp(self.rate, t_span, [x0], t_eval=t_eval, args=(harvest_amt,))
+
+    def step(self, pops, harvests=None, mode='closed', dt=1):
+        '''population after dt months for arrays of populations and harvests, with fixed points;
+        mode 'closed' is analytic, 'ode' integrates each population numerically (reference)'''
+        harvests = self.harvest if harvests is None else harvests
+        pops = np.asarray(pops, dtype=np.float64)
+        harvests = np.broadcast_to(np.asarray(harvests, dtype=np.float64), pops.shape)
+        assert np.all(harvests <= pops)
+        min_pop, max_pop = self.fixed_pts(harvests)
+
+        if mode == 'ode':
+            new_pop = np.empty(pops.shape)
+            for idx in np.ndindex(pops.shape):
+                caribou_sol = self.solve(pops[idx], harvests[idx])
+                new_pop[idx] = caribou_sol.y[0][np.abs(caribou_sol.t - dt).argmin()]
+        else:
+            # dp/dt = -(r / K) * (p - p_min) * (p - p_max)
+            root = max_pop - min_pop
+            decay = np.exp(-self.r / self.K * root * dt)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                new_pop = (max_pop * (pops - min_pop) - min_pop * (pops - max_pop) * decay) / ((pops - min_pop) - (pops - max_pop) * decay)
+                # double root (harvest at max sustainable yield): 1 / (p - K/2) grows linearly
+                new_pop_double = min_pop + (pops - min_pop) / (1 + self.r / self.K * (pops - min_pop) * dt)
+            new_pop = np.where(root < 1e-6 * self.K, new_pop_double, new_pop)
+        return {
+            'p_next': new_pop[()],
+            'p_min': min_pop[()],
+            'p_max': max_pop[()]
+        }
+
+
+# default model, used by the module-level helpers below
+default_model = PreyModel()
+
+
 # Differential equation dx/dt
 def caribou_model(t, p):
-    return r * p * (1 - p / K) - H
+    return default_model.rate(t, p)
 
 
 def get_pop_fixed_pts(harvest_amt):
-    # check whether H is too high
-    if H > r * K / 4:
-        raise ValueError("Harvesting rate too high, definite extinction")
-    p_min = (K - np.sqrt(K ** 2 - 4 * K * harvest_amt / r)) / 2
-    p_max = (K + np.sqrt(K ** 2 - 4 * K * harvest_amt / r)) / 2
-    return p_min, p_max
+    return default_model.fixed_pts(harvest_amt)
 
 
 def get_max_harvest():
-    return caribou_model(0, K / 2) + H
+    return default_model.max_harvest()
 
 
 def solve(model, x0, t_span, t_eval):
@@ -50,36 +113,15 @@ def solve(model, x0, t_span, t_eval):
     return sol
 
 
-# TODO: Add code to find next month's pop, and how much pop to refill
-# TODO: to ensure pop doesn't go extinct
+def prey_step(pop_cur, harvest_amt, dt=1):
+    '''closed-form population after dt months of logistic growth with constant harvest,
+    vectorized over arrays of populations and harvests'''
+    return default_model.step(pop_cur, harvest_amt, mode='closed', dt=dt)
 
 
-def prey_model(pop_cur, harvest_amt):
-    assert harvest_amt <= pop_cur
-    global H
-    H = harvest_amt
-    caribou_sol = solve_ivp(caribou_model, t_span, [pop_cur], t_eval=t_eval)
-    
-    # Plot the results
-    # plt.figure(figsize=(8, 5))
-    # plt.plot(caribou_sol.t, caribou_sol.y[0], label=f'h = {harvest_amt}')
-    # plt.axhline(K, color='blue', linestyle='--', label='Carrying Capacity')
-    # plt.xlabel('Time (months)')
-    # plt.ylabel('Caribou Population')
-    # plt.title('Caribou Population with Harvesting')
-    # plt.legend()
-    # plt.grid(True)
-    # plt.show()
-    # print(caribou_sol)
-
-    idx = min(range(len(caribou_sol.t)), key=lambda i: abs(caribou_sol.t[i]-1))
-    new_pop = caribou_sol.y[0][idx]
-    min_pop, max_pop = get_pop_fixed_pts(harvest_amt)
-    return {
-        'p_next': new_pop,
-        'p_min': min_pop,
-        'p_max': max_pop
-    }
+def prey_model(pop_cur, harvest_amt, mode='ode'):
+    '''next month's population; mode 'ode' integrates numerically (reference), 'closed' uses prey_step'''
+    return default_model.step(pop_cur, harvest_amt, mode=mode)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+
+STORE_FORMATS = ('npz', 'npy', 'parquet')
+SERIES_KEYS = ('mass', 'food', 'fire', 'phase2', 'cari_pop', 'cari_add', 'residual')
+
+
+def _default_path(fmt):
+	return {'npz': 'results.npz', 'npy': 'results_npy', 'parquet': 'results_parquet'}[fmt]
+
+
+def save_results(result, costs, meta, path=None, fmt='npz'):
+	'''Writes per-trial series and cost breakdowns in a columnar store.
+
+	npz: one compressed archive. npy: a directory of raw .npy arrays (memory-mappable
+	with load_results(..., mmap=True)). parquet: a directory holding a long-form
+	series table (trial, month, ...) and a per-trial costs table, requires pyarrow.
+	'''
+	path = _default_path(fmt) if path is None else path
+	meta_json = json.dumps(meta)
+	if fmt == 'npz':
+		arrays = {key: result[key] for key in SERIES_KEYS}
+		arrays.update({f"cost_{key}": value for key, value in costs.items()})
+		np.savez_compressed(path, meta=np.array(meta_json), **arrays)
+	elif fmt == 'npy':
+		os.makedirs(path, exist_ok=True)
+		for key in SERIES_KEYS:
+			np.save(os.path.join(path, f"{key}.npy"), result[key])
+		for key, value in costs.items():
+			np.save(os.path.join(path, f"cost_{key}.npy"), value)
+		with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as file:
+			file.write(meta_json)
+	elif fmt == 'parquet':
+		import pyarrow as pa
+		import pyarrow.parquet as pq
+
+		os.makedirs(path, exist_ok=True)
+		n, t = result['food'].shape
+		series = {
+			'trial': np.repeat(np.arange(n, dtype=np.int32), t),
+			'month': np.tile(np.arange(t, dtype=np.int32), n),
+		}
+		series.update({key: result[key][:, :t].ravel() for key in SERIES_KEYS})
+		table = pa.table(series).replace_schema_metadata({'meta': meta_json})
+		pq.write_table(table, os.path.join(path, 'series.parquet'), compression='zstd')
+		cost_table = pa.table({'trial': np.arange(n, dtype=np.int32), 'final_mass': result['mass'][:, t], **costs})
+		pq.write_table(cost_table, os.path.join(path, 'costs.parquet'), compression='zstd')
+	else:
+		raise ValueError(f"Unknown store format {fmt}, expected one of {STORE_FORMATS}")
+	return path
+
+
+def load_results(path, mmap=False):
+	'''Reads a store written by save_results, returns (result, costs, meta).'''
+	if os.path.isdir(path) and os.path.exists(os.path.join(path, 'series.parquet')):
+		import pyarrow.parquet as pq
+
+		table = pq.read_table(os.path.join(path, 'series.parquet'))
+		meta = json.loads(table.schema.metadata[b'meta'])
+		cost_table = pq.read_table(os.path.join(path, 'costs.parquet'))
+		n, t = cost_table.num_rows, meta['t']
+		result = {key: table.column(key).to_numpy().reshape(n, t) for key in SERIES_KEYS}
+		result['mass'] = np.hstack([result['mass'], cost_table.column('final_mass').to_numpy()[:, None]])
+		costs = {key: cost_table.column(key).to_numpy() for key in cost_table.column_names if key not in ('trial', 'final_mass')}
+	elif os.path.isdir(path):
+		mmap_mode = 'r' if mmap else None
+		result = {key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode=mmap_mode) for key in SERIES_KEYS}
+		costs = {
+			name[len('cost_'):-len('.npy')]: np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+			for name in sorted(os.listdir(path)) if name.startswith('cost_')
+		}
+		with open(os.path.join(path, 'meta.json'), encoding='utf-8') as file:
+			meta = json.load(file)
+	else:
+		with np.load(path) as store:
+			result = {key: store[key] for key in SERIES_KEYS}
+			costs = {key[len('cost_'):]: store[key] for key in store.files if key.startswith('cost_')}
+			meta = json.loads(str(store['meta']))
+	return result, costs, meta
+
+
+if __name__ == '__main__':
+	# render the tabulate report (results.txt) from a store
+	from model import write_results, compute_costs, COST_SCENARIOS
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument('path', type=str, help='results store written by model.py --out-format npz/npy/parquet')
+	parser.add_argument('--cost', choices=list(COST_SCENARIOS), default=None, help='re-price the stored series under another cost scenario')
+	parser.add_argument('--plot', action="store_true")
+	args = parser.parse_args()
+
+	result, costs, meta = load_results(args.path, mmap=True)
+	if args.cost is not None:
+		costs = compute_costs(result, meta['phase2'], args.cost)
+	write_results(result, costs, meta['phase2'], plot_caribou=args.plot)
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+
+LOG_FORMATS = ('text', 'jsonl', 'csv')
+
+
+class SimLog:
+	'''Run log for "dragon got too big" events, opened once per run.
+
+	Lines are held in a bounded buffer and written out whenever it fills up. With
+	summary=True, events are folded into one record per trial (first month, count,
+	total residual caribou) that is written when the log is closed.
+	'''
+
+	def __init__(self, path='log.txt', fmt='text', summary=False, buffer_lines=1024):
+		if fmt not in LOG_FORMATS:
+			raise ValueError(f"Unknown log format {fmt}, expected one of {LOG_FORMATS}")
+		self.fmt = fmt
+		self.summary = summary
+		self.buffer_lines = buffer_lines
+		self.buffer = []
+		self.trials = {}	# trial -> [first_month, count, total_residual]
+		self.file = open(path, 'w', encoding='utf-8', newline='')
+		if fmt == 'csv':
+			header = ['trial', 'first_month', 'count', 'total_residual'] if summary else ['trial', 'month', 'residual']
+			self._write(header)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def _write(self, row):
+		if self.fmt == 'csv':
+			out = io.StringIO()
+			csv.writer(out, lineterminator='\n').writerow(row)
+			self.buffer.append(out.getvalue())
+		else:
+			self.buffer.append(row)
+		if len(self.buffer) >= self.buffer_lines:
+			self.flush()
+
+	def flush(self):
+		self.file.write(''.join(self.buffer))
+		self.buffer = []
+
+	def too_big(self, trial, month, residual):
+		'''one month where required food exceeded the maximum harvest by residual caribou'''
+		trial, month, residual = int(trial), int(month), float(residual)
+		if self.summary:
+			record = self.trials.setdefault(trial, [month, 0, 0.0])
+			record[1] += 1
+			record[2] += residual
+		elif self.fmt == 'text':
+			self._write(
+				f"Trial {trial}, Month {month}: Dragon got too big, required food exceeded maximum harvest - Limiting dragon food intake\n"
+				f"Requires {residual} more caribou to return it to max harvest to avoid extinction\n"
+			)
+		elif self.fmt == 'jsonl':
+			self._write(json.dumps({'trial': trial, 'month': month, 'residual': residual}) + '\n')
+		else:
+			self._write([trial, month, residual])
+
+	def residuals(self, residual, first_trial=0):
+		'''logs every positive entry of an (n, t) residual array, in trial order;
+		row i is trial first_trial + i'''
+		too_big = residual > 0
+		if self.summary:
+			for row in np.flatnonzero(too_big.any(axis=1)):
+				record = self.trials.setdefault(first_trial + int(row), [int(too_big[row].argmax()), 0, 0.0])
+				record[1] += int(too_big[row].sum())
+				record[2] += float(residual[row][too_big[row]].sum())
+			return
+		for row, month in np.argwhere(too_big):
+			self.too_big(first_trial + row, month, residual[row, month])
+
+	def _write_summary(self):
+		for trial in sorted(self.trials):
+			first_month, count, total = self.trials[trial]
+			if self.fmt == 'text':
+				self._write(f"Trial {trial}: Dragon got too big in {count} months (first: month {first_month}), requires {total} more caribou in total\n")
+			elif self.fmt == 'jsonl':
+				self._write(json.dumps({'trial': trial, 'first_month': first_month, 'count': count, 'total_residual': total}) + '\n')
+			else:
+				self._write([trial, first_month, count, total])
+
+	def close(self):
+		if self.file.closed:
+			return
+		if self.summary:
+			self._write_summary()
+		self.flush()
+		self.file.close()
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+class RunningStats:
+	'''Running count, mean, variance, min and max per column, folded in chunks of rows
+	(Chan et al. parallel update), so raw rows can be dropped once folded.'''
+
+	def __init__(self, shape):
+		self.count = 0
+		self.mean = np.zeros(shape)
+		self.m2 = np.zeros(shape)
+		self.min = np.full(shape, np.inf)
+		self.max = np.full(shape, -np.inf)
+
+	def update(self, rows):
+		rows = np.asarray(rows, dtype=np.float64)
+		k = len(rows)
+		if k == 0:
+			return
+		chunk_mean = rows.mean(axis=0)
+		chunk_m2 = ((rows - chunk_mean) ** 2).sum(axis=0)
+		delta = chunk_mean - self.mean
+		total = self.count + k
+		self.mean = self.mean + delta * (k / total)
+		self.m2 = self.m2 + chunk_m2 + delta ** 2 * (self.count * k / total)
+		self.count = total
+		self.min = np.minimum(self.min, rows.min(axis=0))
+		self.max = np.maximum(self.max, rows.max(axis=0))
+
+	@property
+	def variance(self):
+		if self.count < 2:
+			return np.zeros_like(self.m2)
+		return self.m2 / (self.count - 1)
+
+
+class Reservoir:
+	'''Uniform reservoir sample (algorithm R) of up to size rows seen so far.'''
+
+	def __init__(self, size, seed=0):
+		self.size = size
+		self.seen = 0
+		self.rows = None
+		self.rng = np.random.default_rng(seed)
+
+	def update(self, rows):
+		rows = np.asarray(rows)
+		if self.size <= 0 or len(rows) == 0:
+			return
+		if self.rows is None:
+			self.rows = np.empty((self.size,) + rows.shape[1:], dtype=rows.dtype)
+		for row in rows:
+			if self.seen < self.size:
+				self.rows[self.seen] = row
+			else:
+				slot = self.rng.integers(0, self.seen + 1)
+				if slot < self.size:
+					self.rows[slot] = row
+			self.seen += 1
+
+	def sample(self):
+		if self.rows is None:
+			return np.empty((0,))
+		return self.rows[:min(self.seen, self.size)]
+
+
+class QuantileSketch(Reservoir):
+	'''Per-column quantile estimates from a reservoir sample of rows.'''
+
+	def quantiles(self, qs):
+		return np.quantile(self.sample().astype(np.float64), qs, axis=0)
+
+
+class StreamSummary:
+	'''Folds chunks of simulated trials into per-month and per-cost-category statistics,
+	optionally keeping a reservoir of keep full trajectories for plotting.'''
+
+	SERIES = ('mass', 'food', 'fire', 'phase2', 'cari_pop', 'cari_add', 'residual')
+
+	def __init__(self, t, quantiles=(0.05, 0.5, 0.95), sketch_size=1024, keep=0, seed=0):
+		self.t = t
+		self.quantiles = np.asarray(quantiles, dtype=np.float64)
+		self.series = {key: RunningStats(t + 1 if key == 'mass' else t) for key in self.SERIES}
+		self.sketches = {key: QuantileSketch(sketch_size, seed=seed + i) for i, key in enumerate(self.SERIES)}
+		self.costs = {}
+		self.cost_sketches = {}
+		self.sketch_size = sketch_size
+		self.seed = seed
+		self.trajectories = {key: Reservoir(keep, seed=seed) for key in self.SERIES}
+
+	def fold(self, result, costs):
+		for key in self.SERIES:
+			self.series[key].update(result[key])
+			self.sketches[key].update(result[key])
+			# same seed per series --> the kept trajectories line up across series
+			self.trajectories[key].update(result[key])
+		for key, value in costs.items():
+			if key not in self.costs:
+				self.costs[key] = RunningStats(())
+				self.cost_sketches[key] = QuantileSketch(self.sketch_size, seed=self.seed)
+			self.costs[key].update(value)
+			self.cost_sketches[key].update(value)
+
+	def summary(self):
+		out = {'quantiles': self.quantiles}
+		for kind, stats, sketches in (('series', self.series, self.sketches), ('cost', self.costs, self.cost_sketches)):
+			for key in stats:
+				out[f"{kind}_{key}_count"] = np.asarray(stats[key].count)
+				out[f"{kind}_{key}_mean"] = stats[key].mean
+				out[f"{kind}_{key}_var"] = stats[key].variance
+				out[f"{kind}_{key}_min"] = stats[key].min
+				out[f"{kind}_{key}_max"] = stats[key].max
+				out[f"{kind}_{key}_q"] = sketches[key].quantiles(self.quantiles)
+		for key, reservoir in self.trajectories.items():
+			if reservoir.size > 0:
+				out[f"keep_{key}"] = reservoir.sample()
+		return out
+
+	def save(self, path):
+		np.savez_compressed(path, **self.summary())
+		return path
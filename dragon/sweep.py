@@ -0,0 +1,139 @@
+import argparse
+import csv
+import itertools
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model import _parse_args, simulate, compute_costs, phase_totals, trial_fire_days
+from powers import POWER_CACHE
+
+
+SWEEP_PARAMS = ('f', 'fire', 'm0', 'p0', 'k', 'pr', 'g1', 'g2')
+
+# fire-day matrices shared by every point with the same (seed, n, t, lam) --> common random numbers;
+# LRU, only filled for lam values more than one point uses (an LHS sweep never repeats one)
+FIRE_CACHE_ENTRIES = 4
+_fire_cache = OrderedDict()
+
+
+def _parse_sweep_args():
+	parser = argparse.ArgumentParser(description='evaluate the dragon model over a grid or Latin hypercube of parameters in one process')
+	parser.add_argument('--grid', nargs='+', default=[], metavar='NAME=V1,V2,...', help=f'grid values per parameter ({", ".join(SWEEP_PARAMS)})')
+	parser.add_argument('--lhs', type=int, default=0, help='number of Latin hypercube points (uses --range)')
+	parser.add_argument('--range', nargs='+', default=[], metavar='NAME=LO:HI', help='parameter ranges for --lhs')
+	parser.add_argument('--sweep-out', type=str, default='sweep.csv', help='results table path')
+	parser.add_argument('--sweep-workers', type=int, default=1, help='number of processes to spread points across')
+	parser.add_argument('--fire-cache', type=int, default=FIRE_CACHE_ENTRIES, help='fire-day matrices (n x t each) kept per process for repeated fire values')
+	# everything else is passed through to model.py's parser (--n, --t, --phase2, --seed, ...)
+	args, model_argv = parser.parse_known_args()
+	model_args = _parse_args(model_argv)
+	if model_args.engine == 'loop':
+		parser.error('--engine loop is the serial reference engine, sweeps run the fast or vec engine')
+	return args, model_args
+
+
+def grid_points(spec):
+	'''cartesian product of {name: [values]}, as a list of dicts'''
+	names = list(spec)
+	return [dict(zip(names, values)) for values in itertools.product(*(spec[name] for name in names))]
+
+
+def lhs_points(ranges, count, seed=0):
+	'''Latin hypercube sample of count points over {name: (lo, hi)}'''
+	rng = np.random.default_rng(seed)
+	points = [{} for _ in range(count)]
+	for name, (lo, hi) in ranges.items():
+		strata = (rng.permutation(count) + rng.random(count)) / count
+		for point, u in zip(points, strata):
+			point[name] = lo + u * (hi - lo)
+	return points
+
+
+def _parse_spec(items, sep):
+	spec = {}
+	for item in items:
+		name, values = item.split('=', 1)
+		if name not in SWEEP_PARAMS:
+			raise ValueError(f"Unknown sweep parameter {name}, expected one of {SWEEP_PARAMS}")
+		spec[name] = [float(value) for value in values.split(sep)]
+	return spec
+
+
+def _shared_fire(base_args, lam, cache=True, max_entries=FIRE_CACHE_ENTRIES):
+	key = (base_args.seed, base_args.n, base_args.t, lam)
+	if key in _fire_cache:
+		_fire_cache.move_to_end(key)
+		return _fire_cache[key]
+	fire = trial_fire_days(base_args.seed, np.arange(base_args.n), base_args.t, lam)
+	if cache and max_entries > 0:
+		_fire_cache[key] = fire
+		while len(_fire_cache) > max_entries:
+			_fire_cache.popitem(last=False)
+	return fire
+
+
+def evaluate_point(base_args, point, share_fire=True, fire_cache=FIRE_CACHE_ENTRIES):
+	'''runs all trials for one parameter point, returns one tidy summary row'''
+	args = argparse.Namespace(**{**vars(base_args), **point})
+	POWER_CACHE.resize(args.power_cache, args.power_cache_mb)
+	result = simulate(args, fire=_shared_fire(base_args, args.fire, cache=share_fire, max_entries=fire_cache))
+	costs = compute_costs(result, args.phase2, args.cost)
+	p1_total, p2_total = phase_totals(costs)
+	final = p1_total + p2_total
+
+	row = {name: getattr(args, name) for name in SWEEP_PARAMS}
+	row.update({
+		'n': args.n,
+		't': args.t,
+		'phase2': args.phase2,
+		'cost': args.cost,
+		'final_cost_mean': final.mean(),
+		'final_cost_std': final.std(ddof=1) if args.n > 1 else 0.0,
+		'p1_cost_mean': p1_total.mean(),
+		'p2_cost_mean': p2_total.mean(),
+	})
+	row.update({f"{key}_mean": value.mean() for key, value in costs.items()})
+	row.update({
+		'p1_months_mean': (~result['phase2']).sum(axis=1).mean(),
+		'too_big_months_mean': (result['residual'] > 0).sum(axis=1).mean(),
+		'cari_add_mean': result['cari_add'].sum(axis=1).mean(),
+		'final_mass_mean': result['mass'][:, -1].mean(),
+	})
+	return row
+
+
+def run_sweep(base_args, points, workers=1, fire_cache=FIRE_CACHE_ENTRIES):
+	# fire matrices are cached only for values more than one point uses
+	uses = Counter(point.get('fire', base_args.fire) for point in points)
+	share = [uses[point.get('fire', base_args.fire)] > 1 for point in points]
+	if workers > 1:
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			return list(pool.map(evaluate_point, [base_args] * len(points), points, share, [fire_cache] * len(points)))
+	return [evaluate_point(base_args, point, shared, fire_cache) for point, shared in zip(points, share)]
+
+
+def write_table(rows, path):
+	with open(path, 'w', encoding='utf-8', newline='') as file:
+		writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+		writer.writeheader()
+		writer.writerows(rows)
+
+
+if __name__ == '__main__':
+	sweep_args, base_args = _parse_sweep_args()
+	points = []
+	if sweep_args.grid:
+		points += grid_points(_parse_spec(sweep_args.grid, ','))
+	if sweep_args.lhs:
+		ranges = {name: tuple(values) for name, values in _parse_spec(sweep_args.range, ':').items()}
+		points += lhs_points(ranges, sweep_args.lhs, seed=base_args.seed)
+	if not points:
+		points = [{}]
+
+	start = time.time()
+	rows = run_sweep(base_args, points, workers=sweep_args.sweep_workers, fire_cache=sweep_args.fire_cache)
+	write_table(rows, sweep_args.sweep_out)
+	print(f"{len(rows)} points x {base_args.n} trials written to {sweep_args.sweep_out} in {time.time() - start:.1f}s")
@@ -0,0 +1,25 @@
+import numpy as np
+
+from model import _parse_args, compute_costs, simulate
+from powers import PowerCache, POWER_CACHE, mass_powers, unique_rows
+
+
+def test_fast_run_shares_one_entry():
+	# the food path (1-D trajectory) and the cost path (identical trial rows) hit the same entry
+	args = _parse_args(['--n', '50', '--t', '120'])
+	POWER_CACHE.clear()
+	POWER_CACHE.hits = POWER_CACHE.misses = 0
+	result = simulate(args)
+	compute_costs(result, args.phase2, args.cost)
+	assert (POWER_CACHE.misses, POWER_CACHE.hits) == (1, 1)
+	assert len(POWER_CACHE.entries) == 1
+
+
+def test_unique_row_does_not_keep_matrix_alive():
+	M = np.tile(np.linspace(1, 2, 100), (1000, 1))
+	rows, inverse = unique_rows(M)
+	assert rows.base is None and rows.shape == (1, 100)
+	cache = PowerCache()
+	terms = mass_powers(M, cache)
+	assert np.array_equal(terms(1, 0.75), M ** 0.75)
+	assert next(iter(cache.entries.values())).nbytes < M.nbytes / 100
@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+MODULES = ('season_index', 'model_eval', 'scoring', 'vote_model', 'vote_sampler')
+# heavy dependencies that should only load on the code paths that need them
+HEAVY = ('cvxpy', 'pandas', 'scipy', 'matplotlib')
+
+_PROBE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(name for name in {heavy!r} if name in sys.modules))
+'''
+
+
+def time_import(module, repeat=5):
+    '''(best import time in ms over repeat fresh interpreters, heavy modules loaded by the import)'''
+    here = os.path.dirname(os.path.abspath(__file__))
+    best, heavy = float('inf'), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY)],
+                             cwd=here, capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(out[0]) * 1000)
+        heavy = out[1].split(',') if len(out) > 1 else []
+    return best, heavy
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='import time of every mcm module in a fresh interpreter, checked against a budget')
+    parser.add_argument('modules', nargs='*', default=list(MODULES), help='modules to time (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per module (best is reported)')
+    parser.add_argument('--budget-ms', type=float, default=250, help='maximum import time per module')
+    parser.add_argument('--json', type=str, default=None, help='also write the results to this file')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    results, over = {}, []
+    for module in args.modules:
+        ms, heavy = time_import(module, args.repeat)
+        results[module] = {'ms': ms, 'heavy': heavy}
+        status = 'ok' if ms <= args.budget_ms and not heavy else 'OVER'
+        if status == 'OVER':
+            over.append(module)
+        print(f"{module:<14} {ms:8.1f} ms  {status:<4}  {'loads ' + ', '.join(heavy) if heavy else ''}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'budget_ms': args.budget_ms, 'modules': results}, file, indent=1)
+    sys.exit(1 if over else 0)
@@ -1,170 +1,216 @@
-import csv
 import numpy as np
-import pandas as pd
-import cvxpy as cp      # highly unfortunate abbreviation
-import matplotlib
-import matplotlib.pyplot as plt
+
+from season_index import load_index, method_type
 
 
 DO_PRINT_WEEK = False
 DO_PRINT_SEASON = True
 
-
-# processed dwts data
-df1 = pd.read_csv('data/season_1_2.csv', header=0)
-df2 = pd.read_csv('data/season_3_27.csv', header=0)
-df3 = pd.read_csv('data/season_28_34.csv', header=0)
-df = pd.concat([df1, df2, df3], ignore_index=True)
-
-column_headers = df.columns.tolist()
-
-
-# fan estimate data
-df_est = pd.read_csv('data/dwts_fan_estimates.csv', header=0)
-column_headers2 = df_est.columns.tolist()
-all_seasons = sorted(list(set(df_est['season'])))
-print(f"Seasons: {all_seasons}")
+# comparison of fan-side difference vs judge-side bound per constraint kind
+OP_GT, OP_GE, OP_LT = 0, 1, 2
 
 
 def perc_list_to_rankings(perc_list: list):
+    import pandas as pd
+
     series = pd.Series(perc_list)
     return series.rank(method='min').tolist()
 
 
+def rank_min(values):
+    '''rank (method='min', 1-base) along the last axis, same as pd.Series.rank(method='min')'''
+    values = np.asarray(values, dtype=np.float64)
+    return (values[..., None, :] < values[..., :, None]).sum(axis=-1) + 1.0
+
+
 def find_cont_num(season_data, cur_week: int):  # RETURNS: current contestants, eliminations (both placements idx)
     '''find current contestants & eliminations for that week'''
-    cur_cont_raw = season_data[season_data[f"week{cur_week}_all_judge_score"].notna()]
-    cur_cont = sorted(list(cur_cont_raw['placement']))
-    elims = []      # (idx, j_perc[idx]), 1-base
-
-    if cur_week == 1:
-        elims = sorted(list(season_data[season_data[f"week{cur_week + 1}_all_judge_score"].isna()]['placement']))
-    # elif cur_week == week_cnt:
-    #     elims = sorted(list(cur_cont_raw[cur_cont_raw['placement'] != 1]['placement']))
-    else:
-        all_gone = season_data[season_data[f"week{cur_week + 1}_all_judge_score"].isna()]
-        elims = sorted(list(all_gone[all_gone[f"week{cur_week}_all_judge_score"].notna()]['placement']))
-    return cur_cont, elims
-
-for season in all_seasons:
-    # scoring type
-    method_type = 1 if 1 <= season <= 2 else 2 if 3 <= season <= 27 else 3
-
-    if DO_PRINT_WEEK:
-        print(f"############## SEASON {season} ##############")
-
-    # extract vote data for seeason
-    season_vote_percentages = []    # [wk1: [p_1, ..., p_n], wk2: [p_1, ..., p_n], ...]
-    cur_season_vote_data = df_est[df_est['season'] == season]
-    num_weeks = sorted(list(set(cur_season_vote_data['week'])))[-1]
-    num_ppl = len(cur_season_vote_data[cur_season_vote_data['week'] == 1])
+    return season_data.contestants(cur_week), season_data.eliminations(cur_week)
 
-    for cur_week in range(1, num_weeks + 1):
-        cur_week_data = cur_season_vote_data[cur_season_vote_data['week'] == cur_week].copy(deep=True)
-        cur_week_data.sort_values(by='placement', inplace=True)
-        
-        vote_data = list(cur_week_data['fan_mean'])
-        # pad 0s (since eliminations are removed from vote data)
-        vote_data += [0 for _ in range(num_ppl - len(vote_data))]
-        season_vote_percentages.append(vote_data)
 
-    # compute rankings from percentages
-    season_vote_rankings = []
-    for week_data in season_vote_percentages:
-        season_vote_rankings.append(perc_list_to_rankings(week_data))
+def season_constraints(season_data, num_weeks: int):
+    '''pairwise constraints of a season, independent of the fan estimates:
+    pairs[w, a, b] marks a constraint between contestants a and b (0-base) in week w + 1,
+    checked as op[w](fan[a] - fan[b], bound[w, a, b]) on fan percentages (method 2) or ranks (methods 1, 3);
+    save[w] failed constraints per eliminated contestant b are forgiven (method 3: judges' save of the bottom two)'''
+    method = method_type(season_data.season)
+    n = season_data.num_ppl
+    pairs = np.zeros((num_weeks, n, n), dtype=bool)
+    bound = np.zeros((num_weeks, n, n))
+    op = np.full(num_weeks, OP_GT)
+    save = np.zeros(num_weeks, dtype=np.int64)
 
-    # extract raw data for season
-    season_data = df[df['season'] == season].copy(deep=True)  # copying season 3
-    season_data.sort_values(by='placement', inplace=True)
+    for cur_week in range(1, num_weeks + 1):
+        cur_cont, elims = find_cont_num(season_data, cur_week)
+        # if no eliminations, no conclusions regarding vote percentages can be made
+        if len(elims) == 0:
+            continue
 
-    #####################################################
+        # judge percentages / rankings of the contestants still in, 0-base --> bound[a, b] = j[b] - j[a]
+        remaining, eliminated = season_data.positions(cur_week)
+        alive = np.sort(np.concatenate([remaining, eliminated]))
+        j_perc = season_data.judge_perc[cur_week - 1, alive]
+        j = j_perc if method == 2 else rank_min(j_perc)
+        bound[cur_week - 1][np.ix_(alive, alive)] = j[None, :] - j[:, None]
 
-    # COMPUTE CONSTRAINT MATCH RATE
-    total_constraints = 0
-    matched_constraints = 0
+        if cur_week == num_weeks:
+            # final week --> every pair i < j of the remaining contestants
+            assert len(cur_cont) == len(elims)
+            pairs[cur_week - 1][np.ix_(alive, alive)] = np.triu(np.ones((len(alive), len(alive)), dtype=bool), k=1)
+            op[cur_week - 1] = OP_LT if method == 1 else OP_GE
+            break
 
-    # iterate through each week, 1-base, assume eliminated each week
-    for cur_week in range(1, num_weeks + 1): 
-        # init
-        week_total_constraints = 0
-        week_matched_constraints = 0
+        if method == 3:
+            # eliminated contestants only need to be in the bottom two --> one remaining contestant may rank below each
+            save[cur_week - 1] = 1
+
+        # intermediate week --> each remaining contestant above each eliminated one
+        pairs[cur_week - 1][np.ix_(remaining, eliminated)] = True
+    return {'season': season_data.season, 'method': method, 'pairs': pairs, 'bound': bound, 'op': op, 'save': save}
+
+
+def count_matches(constraints, fan):
+    '''match counts of fan estimates against a season's constraints;
+    fan is (weeks, n) or a stacked batch (candidates, weeks, n) --> (total (weeks,), matched (candidates, weeks))'''
+    fan = np.asarray(fan, dtype=np.float64)
+    fan = fan[None] if fan.ndim == 2 else fan
+    pairs, bound, op, save = constraints['pairs'], constraints['bound'], constraints['op'], constraints['save']
+    weeks = len(pairs)
+
+    vals = fan[:, :weeks] if constraints['method'] == 2 else rank_min(fan[:, :weeks])
+    diff = vals[..., :, None] - vals[..., None, :]  # (candidates, weeks, n, n)
+    op = op[None, :, None, None]
+    matched = np.where(op == OP_GT, diff > bound, np.where(op == OP_GE, diff >= bound, diff < bound)) & pairs
+    # judges' save: forgive up to save[w] failures per eliminated contestant (column)
+    failed = pairs.sum(axis=1) - matched.sum(axis=2)    # (candidates, weeks, n)
+    forgiven = np.minimum(failed, save[None, :, None]).sum(axis=2)
+    return pairs.sum(axis=(1, 2)), matched.sum(axis=(2, 3)) + forgiven
+
+
+def count_matches_loop(season_data, season_vote_percentages: list):
+    '''reference implementation of count_matches, one pair at a time'''
+    season = season_data.season
+    method_type_ = method_type(season)
+    num_weeks = len(season_vote_percentages)
+    season_vote_rankings = [perc_list_to_rankings(week_data) for week_data in season_vote_percentages]
+    week_totals, week_matches = [0] * num_weeks, [0] * num_weeks
 
-        # filter for weekly vote data
+    # iterate through each week, 1-base, assume eliminated each week
+    for cur_week in range(1, num_weeks + 1):
         week_vote_percentages = season_vote_percentages[cur_week - 1]
         week_vote_rankings = season_vote_rankings[cur_week - 1]
-
-        # find current contestants & eliminations
         cur_cont, elims = find_cont_num(season_data, cur_week)
-
-        # if no eliminations, no conclusions regarding vote percentages can be made
         if len(elims) == 0:
-            if DO_PRINT_WEEK:
-                print(f"############## WEEK {cur_week} ##############")
-                print(f"Eliminations: None")
-                print()
             continue
 
-        # compute judge percentages, 0-base
-        j_perc = list(season_data[f"week{cur_week}_percent_judge_score"].iloc[0: elims[-1]])
-
-        # compute judge ranking from percentages, 0-base
-        j_rank = perc_list_to_rankings(j_perc)
+        # compute judge percentages + ranking from percentages of the contestants still in, 0-base
+        remaining, eliminated = season_data.positions(cur_week)
+        alive = sorted(remaining.tolist() + eliminated.tolist())
+        j_perc, j_rank = [None] * season_data.num_ppl, [None] * season_data.num_ppl
+        for pos, perc, rank in zip(alive, season_data.judge_perc[cur_week - 1, alive], perc_list_to_rankings(season_data.judge_perc[cur_week - 1, alive].tolist())):
+            j_perc[pos], j_rank[pos] = perc, rank
 
         # if final week --> compute all quadratic/linear program constraints
         if cur_week == num_weeks:
             assert len(cur_cont) == len(elims)
-            for i in range(0, len(cur_cont) - 1):
-                for j in range(i + 1, len(cur_cont)):
-                    if method_type == 1:
-                        total_constraints += 1
-                        week_total_constraints += 1
+            for idx, i in enumerate(alive):
+                for j in alive[idx + 1:]:
+                    if method_type_ == 1:
+                        week_totals[cur_week - 1] += 1
                         if week_vote_rankings[i] - week_vote_rankings[j] < j_rank[j] - j_rank[i]:
-                            matched_constraints += 1
-                            week_matched_constraints += 1
-                    elif method_type == 2:
-                        total_constraints += 1
-                        week_total_constraints += 1
+                            week_matches[cur_week - 1] += 1
+                    elif method_type_ == 2:
+                        week_totals[cur_week - 1] += 1
                         if week_vote_percentages[i] - week_vote_percentages[j] >= j_perc[j] - j_perc[i]:
-                            matched_constraints += 1
-                            week_matched_constraints += 1
-            if DO_PRINT_WEEK:
-                print(f"############## FINAL WEEK ##############")
-                print(f"Eliminations: {elims}")
-                print(f"Total: {week_total_constraints}")
-                print(f"Matched: {week_matched_constraints}")
-                print(f"Match Rate %: {week_matched_constraints / week_total_constraints * 100:.2f}")
-                print()
+                            week_matches[cur_week - 1] += 1
+                    else:
+                        week_totals[cur_week - 1] += 1
+                        if week_vote_rankings[i] - week_vote_rankings[j] >= j_rank[j] - j_rank[i]:
+                            week_matches[cur_week - 1] += 1
             break
 
         # else (intermediate week) --> compute constraints applied to remaining by eliminated
-        for i in range(len(elims)):
-            el = elims[i]  # 1-base
-            for j in range(len(cur_cont) - len(elims)):
-                if method_type == 1:
-                    total_constraints += 1
-                    week_total_constraints += 1
-                    if week_vote_rankings[j] - week_vote_rankings[el - 1] > j_rank[el - 1] - j_rank[j]:
-                        matched_constraints += 1
-                        week_matched_constraints += 1
-                elif method_type == 2:
-                    total_constraints += 1
-                    week_total_constraints += 1
-                    if week_vote_percentages[j] - week_vote_percentages[el - 1] > j_perc[el - 1] - j_perc[j]:
-                        matched_constraints += 1
-                        week_matched_constraints += 1
+        for el in eliminated:   # 0-base
+            failed = 0
+            for j in remaining:
+                week_totals[cur_week - 1] += 1
+                if method_type_ == 2:
+                    matched = week_vote_percentages[j] - week_vote_percentages[el] > j_perc[el] - j_perc[j]
+                else:
+                    matched = week_vote_rankings[j] - week_vote_rankings[el] > j_rank[el] - j_rank[j]
+                week_matches[cur_week - 1] += matched
+                failed += not matched
+            if method_type_ == 3:
+                # judges' save: eliminated only needs to be in the bottom two --> one failure forgiven
+                week_matches[cur_week - 1] += min(failed, 1)
+    return week_totals, week_matches
+
+
+def evaluate(seasons, estimates: dict):
+    '''tidy per candidate/season/week match table for {season: fan estimates (weeks, n) or (candidates, weeks, n)}'''
+    import pandas as pd
+
+    frames = []
+    for season, fan in estimates.items():
+        fan = np.asarray(fan, dtype=np.float64)
+        fan = fan[None] if fan.ndim == 2 else fan
+        constraints = season_constraints(seasons[season], fan.shape[1])
+        total, matched = count_matches(constraints, fan)
+        candidates, weeks = matched.shape
+        frames.append(pd.DataFrame({
+            'candidate': np.repeat(np.arange(candidates), weeks),
+            'season': season,
+            'method': constraints['method'],
+            'week': np.tile(np.arange(1, weeks + 1), candidates),
+            'eliminations': np.tile(constraints['pairs'].any(axis=(1, 2)), candidates),
+            'total': np.tile(total, candidates),
+            'matched': matched.reshape(-1),
+        }))
+    table = pd.concat(frames, ignore_index=True)
+    table['match_rate'] = table['matched'] / table['total'].where(table['total'] > 0)
+    return table
+
+
+def season_table(table):
+    '''per candidate/season totals of an evaluate() table'''
+    totals = table.groupby(['candidate', 'season', 'method'], as_index=False)[['total', 'matched']].sum()
+    totals['match_rate'] = totals['matched'] / totals['total'].where(totals['total'] > 0)
+    return totals
+
+
+if __name__ == '__main__':
+    # processed dwts data + fan estimates (season index, built on first use)
+    seasons = load_index()
+    all_seasons = sorted(season for season, data in seasons.items() if data.fan is not None)
+    print(f"Seasons: {all_seasons}")
+
+    # COMPUTE CONSTRAINT MATCH RATE
+    table = evaluate(seasons, {season: seasons[season].fan for season in all_seasons})
+
+    for season in all_seasons:
+        season_weeks = table[table['season'] == season]
+        method_type_ = method_type(season)
 
         if DO_PRINT_WEEK:
-            print(f"############## WEEK {cur_week} ##############")
-            print(f"Eliminations: {elims}")
-            print(f"Total: {week_total_constraints}")
-            print(f"Matched: {week_matched_constraints}")
-            print(f"Match Rate %: {week_matched_constraints / week_total_constraints * 100:.2f}")
-            print()
-    if DO_PRINT_SEASON:
-        print(f"############## RESULTS FOR SEASON {season} ##############")
-        print(f"Scoring Type: {'Ranks' if method_type == 1 else 'Percentages' if method_type == 2 else 'Fuck me'}")
-        print(f"Total: {total_constraints}")
-        print(f"Matched: {matched_constraints}")
-        print(f"Match Rate %: {matched_constraints / total_constraints * 100:.2f}")
-
-print(f"############## END RESULTS ##############")
+            print(f"############## SEASON {season} ##############")
+            for row in season_weeks.itertuples():
+                print(f"############## {'FINAL WEEK' if row.week == len(season_weeks) else f'WEEK {row.week}'} ##############")
+                if not row.eliminations:
+                    print(f"Eliminations: None")
+                    print()
+                    continue
+                print(f"Eliminations: {seasons[season].eliminations(row.week)}")
+                print(f"Total: {row.total}")
+                print(f"Matched: {row.matched}")
+                print(f"Match Rate %: {row.match_rate * 100:.2f}")
+                print()
+
+        if DO_PRINT_SEASON:
+            total_constraints, matched_constraints = season_weeks['total'].sum(), season_weeks['matched'].sum()
+            print(f"############## RESULTS FOR SEASON {season} ##############")
+            print(f"Scoring Type: {'Ranks' if method_type_ == 1 else 'Percentages' if method_type_ == 2 else 'Ranks + Judges Save'}")
+            print(f"Total: {total_constraints}")
+            print(f"Matched: {matched_constraints}")
+            print(f"Match Rate %: {matched_constraints / total_constraints * 100:.2f}")
+
+    print(f"############## END RESULTS ##############")
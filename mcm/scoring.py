@@ -0,0 +1,170 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from season_index import DATA_DIR, FAN_FILE, load_index
+from model_eval import OP_GT, OP_GE, rank_min, season_constraints
+
+
+class CompiledConstraints:
+    '''Elimination constraints of every estimated season, compiled once as sparse arrays.
+
+    A candidate is one fan_mean vector aligned with the rows of the estimates csv. Its values
+    are scattered into a padded slot layout (season, week, placement order, eliminations = 0)
+    and constraint k checks op[k](v[i[k]] - v[j[k]], bound[k]), where v are percentages
+    (method 2) or per-week min-ranks (methods 1, 3). group[k] indexes the (season, week) of k;
+    constraints sharing an eliminated contestant j form a column, of which save failures are
+    forgiven (method 3 judges' save).
+    '''
+
+    def __init__(self, seasons, estimates):
+        self.row_slot = np.zeros(len(estimates), dtype=np.intp)
+        self.blocks = []            # (season, method, first slot, weeks, n)
+        i, j, bound, op, group, save = [], [], [], [], [], []
+        group_season, group_week = [], []
+
+        offset = 0
+        for season, season_est in estimates.groupby('season', sort=True):
+            season_data = seasons[int(season)]
+            n, weeks = season_data.num_ppl, int(season_est['week'].max())
+            # slot of each csv row: same layout as Season.fan (weeks sorted by placement, padded)
+            for week, week_est in season_est.groupby('week'):
+                rows = week_est.sort_values(by='placement', kind='stable').index.to_numpy()
+                self.row_slot[rows] = offset + (int(week) - 1) * n + np.arange(len(rows))
+
+            constraints = season_constraints(season_data, weeks)
+            # column-major, so constraints of one eliminated contestant are contiguous
+            w, b, a = np.nonzero(constraints['pairs'].transpose(0, 2, 1))
+            i.append(offset + w * n + a)
+            j.append(offset + w * n + b)
+            bound.append(constraints['bound'][w, a, b])
+            op.append(constraints['op'][w])
+            save.append(constraints['save'][w])
+            group.append(len(group_season) + w)
+            group_season += [int(season)] * weeks
+            group_week += list(range(1, weeks + 1))
+
+            self.blocks.append((int(season), constraints['method'], offset, weeks, n))
+            offset += weeks * n
+
+        self.slots = offset
+        self.i, self.j = np.concatenate(i), np.concatenate(j)
+        self.bound, self.op, self.group = np.concatenate(bound), np.concatenate(op), np.concatenate(group)
+        self.group_season, self.group_week = np.array(group_season), np.array(group_week)
+        groups = np.arange(len(self.group_season))
+        self.group_start = np.searchsorted(self.group, groups, side='left')
+        self.group_end = np.searchsorted(self.group, groups, side='right')
+        self.total = self.group_end - self.group_start
+
+        # columns: runs of constraints with the same eliminated slot
+        new_column = np.r_[True, self.j[1:] != self.j[:-1]] if len(self.j) else np.zeros(0, dtype=bool)
+        self.column_start = np.flatnonzero(new_column)
+        self.column_end = np.r_[self.column_start[1:], len(self.j)]
+        self.column_save = np.concatenate(save)[self.column_start]
+        column_group = self.group[self.column_start]
+        self.group_column_start = np.searchsorted(column_group, groups, side='left')
+        self.group_column_end = np.searchsorted(column_group, groups, side='right')
+
+    def values(self, candidates):
+        '''(N, rows) candidate fan_mean vectors --> (N, slots) constraint values'''
+        candidates = np.atleast_2d(np.asarray(candidates, dtype=np.float64))
+        vals = np.zeros((len(candidates), self.slots))
+        vals[:, self.row_slot] = candidates
+        for season, method, first, weeks, n in self.blocks:
+            if method != 2:
+                block = vals[:, first:first + weeks * n].reshape(-1, weeks, n)
+                vals[:, first:first + weeks * n] = rank_min(block).reshape(len(vals), -1)
+        return vals
+
+    def matched(self, candidates):
+        '''(N, groups) matched constraint counts per candidate and (season, week)'''
+        vals = self.values(candidates)
+        diff = vals[:, self.i] - vals[:, self.j]
+        hit = np.where(self.op == OP_GT, diff > self.bound, np.where(self.op == OP_GE, diff >= self.bound, diff < self.bound))
+        # per-group sums of the hits (constraints are stored group by group)
+        hits = np.zeros((len(hit), len(self.group) + 1), dtype=np.int64)
+        np.cumsum(hit, axis=1, out=hits[:, 1:])
+        # judges' save: forgive up to column_save failures per column
+        failed = (self.column_end - self.column_start) - (hits[:, self.column_end] - hits[:, self.column_start])
+        forgiven = np.zeros((len(hit), len(self.column_start) + 1), dtype=np.int64)
+        np.cumsum(np.minimum(failed, self.column_save), axis=1, out=forgiven[:, 1:])
+        return (hits[:, self.group_end] - hits[:, self.group_start]
+                + forgiven[:, self.group_column_end] - forgiven[:, self.group_column_start])
+
+
+def load_estimates(path=None):
+    import pandas as pd
+
+    return pd.read_csv(path or os.path.join(DATA_DIR, FAN_FILE), header=0)
+
+
+def sample_candidates(estimates, count, seed=0):
+    '''candidate fan_mean vectors drawn uniformly in [fan_lo, fan_hi], renormalized to 1 per season/week'''
+    rng = np.random.default_rng(seed)
+    lo, hi = estimates['fan_lo'].to_numpy(), estimates['fan_hi'].to_numpy()
+    samples = lo + rng.random((count, len(estimates))) * (hi - lo)
+    groups = estimates.groupby(['season', 'week']).ngroup().to_numpy()
+    sums = np.zeros((count, groups.max() + 1))
+    np.add.at(sums, (slice(None), groups), samples)
+    return samples / sums[:, groups]
+
+
+def score(compiled, candidates, workers=1, chunk=1000):
+    '''(N, groups) matched counts, candidates split across a process pool when workers > 1'''
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=np.float64))
+    parts = np.array_split(candidates, max(workers, -(-len(candidates) // chunk)))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return np.concatenate(list(pool.map(compiled.matched, parts)))
+    return np.concatenate([compiled.matched(part) for part in parts])
+
+
+def score_table(compiled, matched):
+    '''tidy candidate/season/week table of match counts and rates'''
+    import pandas as pd
+
+    candidates, groups = matched.shape
+    total = np.tile(compiled.total, candidates)
+    table = pd.DataFrame({
+        'candidate': np.repeat(np.arange(candidates), groups),
+        'season': np.tile(compiled.group_season, candidates),
+        'week': np.tile(compiled.group_week, candidates),
+        'total': total,
+        'matched': matched.reshape(-1),
+    })
+    table['match_rate'] = table['matched'] / table['total'].where(table['total'] > 0)
+    return table
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='score many candidate fan estimates against the elimination constraints of every season')
+    parser.add_argument('candidates', type=str, nargs='?', help='.npy (N, rows) of fan_mean vectors aligned with the estimates csv')
+    parser.add_argument('--estimates', type=str, default=None, help='fan estimates csv (default data/dwts_fan_estimates.csv)')
+    parser.add_argument('--sample', type=int, default=0, help='score N candidates sampled in [fan_lo, fan_hi] instead')
+    parser.add_argument('--seed', type=int, default=0, help='seed for --sample')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to split candidates across')
+    parser.add_argument('--out', type=str, default='scores.csv', help='per candidate/season/week table (.csv, or .npz of raw counts)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    estimates = load_estimates(args.estimates)
+    if args.candidates:
+        candidates = np.load(args.candidates, mmap_mode='r')
+    elif args.sample:
+        candidates = sample_candidates(estimates, args.sample, seed=args.seed)
+    else:
+        candidates = estimates['fan_mean'].to_numpy()[None]
+
+    start = time.time()
+    compiled = CompiledConstraints(load_index(), estimates)
+    matched = score(compiled, candidates, workers=args.workers)
+    if args.out.endswith('.npz'):
+        np.savez_compressed(args.out, matched=matched, total=compiled.total, season=compiled.group_season, week=compiled.group_week)
+    else:
+        score_table(compiled, matched).to_csv(args.out, index=False)
+    print(f"{len(matched)} candidates x {len(compiled.total)} season weeks ({len(compiled.i)} constraints) scored in {time.time() - start:.2f}s --> {args.out}")
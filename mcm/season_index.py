@@ -0,0 +1,150 @@
+import json
+import os
+
+import numpy as np
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+INDEX_PATH = os.path.join(DATA_DIR, 'season_index.npz')
+SEASON_FILES = ('season_1_2.csv', 'season_3_27.csv', 'season_28_34.csv')
+FAN_FILE = 'dwts_fan_estimates.csv'
+MAX_WEEKS = 11
+INDEX_VERSION = 1
+
+SEASON_FIELDS = ('names', 'placement', 'alive', 'elim', 'judge_all', 'judge_perc', 'judge_rank')
+
+
+def method_type(season: int):
+    '''scoring type of a season --> 1: ranking, 2: percentages, 3: bottom two + judges' save'''
+    return 1 if 1 <= season <= 2 else 2 if 3 <= season <= 27 else 3
+
+
+class Season:
+    '''Precomputed arrays for one season, contestants ordered by placement (row i = i-th placed).
+
+    alive[w, i]: contestant i has judge scores in week w + 1
+    elim[w, i]: contestant i is eliminated in week w + 1 (alive that week, not the next)
+    judge_all / judge_perc / judge_rank[w, i]: week w + 1 judge total, percentage, rank
+    fan[w, i]: mean fan vote estimate for week w + 1 (eliminated contestants padded with 0), if estimated
+    '''
+
+    def __init__(self, season, names, placement, alive, elim, judge_all, judge_perc, judge_rank, fan=None):
+        self.season = int(season)
+        self.method = method_type(self.season)
+        self.names = names
+        self.placement = placement
+        self.alive = alive
+        self.elim = elim
+        self.judge_all = judge_all
+        self.judge_perc = judge_perc
+        self.judge_rank = judge_rank
+        self.fan = fan
+        # number of weeks season ran for
+        self.num_weeks = int(alive.any(axis=1).sum())
+        self.num_ppl = len(placement)
+
+    def contestants(self, week: int):
+        '''placements (1-base) of contestants competing in week (1-base)'''
+        return self.placement[self.alive[week - 1]].tolist()
+
+    def eliminations(self, week: int):
+        '''placements (1-base) of contestants eliminated in week (1-base)'''
+        return self.placement[self.elim[week - 1]].tolist()
+
+    def positions(self, week: int):
+        '''(remaining, eliminated) row positions (0-base) in week (1-base); unlike placements, distinct for ties'''
+        alive, elim = self.alive[week - 1], self.elim[week - 1]
+        return np.flatnonzero(alive & ~elim), np.flatnonzero(elim)
+
+    def fan_weeks(self):
+        '''number of weeks with fan vote estimates'''
+        return 0 if self.fan is None else len(self.fan)
+
+
+def _source_paths(data_dir):
+    return [os.path.join(data_dir, name) for name in SEASON_FILES + (FAN_FILE,)]
+
+
+def _signature(data_dir):
+    '''identifies the source csvs the index was built from'''
+    stats = [os.stat(path) for path in _source_paths(data_dir) if os.path.exists(path)]
+    return {'version': INDEX_VERSION, 'sources': [[stat.st_size, stat.st_mtime_ns] for stat in stats]}
+
+
+def build_index(data_dir=DATA_DIR):
+    '''reads the processed csvs once, returns {season: Season}'''
+    import pandas as pd
+
+    df = pd.concat([pd.read_csv(os.path.join(data_dir, name), header=0) for name in SEASON_FILES], ignore_index=True)
+    fan_path = os.path.join(data_dir, FAN_FILE)
+    df_est = pd.read_csv(fan_path, header=0) if os.path.exists(fan_path) else None
+
+    def week_matrix(season_data, kind, dtype=np.float64):
+        cols = [f"week{i}_{kind}_judge_score" for i in range(1, MAX_WEEKS + 1)]
+        return season_data[cols].to_numpy(dtype=dtype).T  # (weeks, contestants)
+
+    seasons = {}
+    for season, season_data in df.groupby('season'):
+        season_data = season_data.sort_values(by='placement', kind='stable')
+        judge_all = week_matrix(season_data, 'all')
+        alive = ~np.isnan(judge_all)
+        # gone next week (week after the last is treated as no scores)
+        gone_next = np.vstack([~alive[1:], np.ones((1, alive.shape[1]), dtype=bool)])
+
+        fan = None
+        if df_est is not None and season in set(df_est['season']):
+            est = df_est[df_est['season'] == season]
+            fan = np.zeros((int(est['week'].max()), len(season_data)))
+            for week, week_data in est.groupby('week'):
+                vote_data = week_data.sort_values(by='placement', kind='stable')['fan_mean'].to_numpy()
+                fan[int(week) - 1, :len(vote_data)] = vote_data
+
+        seasons[int(season)] = Season(
+            season,
+            names=season_data['celebrity_name'].to_numpy(dtype=str),
+            placement=season_data['placement'].to_numpy(dtype=np.int64),
+            alive=alive,
+            elim=alive & gone_next,
+            judge_all=judge_all,
+            judge_perc=week_matrix(season_data, 'percent'),
+            judge_rank=week_matrix(season_data, 'rank'),
+            fan=fan,
+        )
+    return seasons
+
+
+def save_index(seasons, path=INDEX_PATH, data_dir=DATA_DIR):
+    arrays = {'meta': np.array(json.dumps(_signature(data_dir)))}
+    for season, data in seasons.items():
+        for field in SEASON_FIELDS:
+            arrays[f"s{season}_{field}"] = getattr(data, field)
+        if data.fan is not None:
+            arrays[f"s{season}_fan"] = data.fan
+    np.savez(path, **arrays)
+
+
+def load_index(path=INDEX_PATH, data_dir=DATA_DIR, rebuild=False):
+    '''{season: Season} from the cached index, (re)built when missing or older than the csvs'''
+    if not rebuild and os.path.exists(path):
+        with np.load(path) as file:
+            if json.loads(str(file['meta'])) == _signature(data_dir):
+                seasons = sorted({int(key[1:].split('_', 1)[0]) for key in file.files if key != 'meta'})
+                return {
+                    season: Season(season, **{field: file[f"s{season}_{field}"] for field in SEASON_FIELDS},
+                                   fan=file[f"s{season}_fan"] if f"s{season}_fan" in file.files else None)
+                    for season in seasons
+                }
+    seasons = build_index(data_dir)
+    save_index(seasons, path, data_dir)
+    return seasons
+
+
+if __name__ == '__main__':
+    import time
+
+    start = time.perf_counter()
+    seasons = load_index(rebuild=True)
+    print(f"Built index of {len(seasons)} seasons in {(time.perf_counter() - start) * 1000:.1f} ms --> {INDEX_PATH}")
+    start = time.perf_counter()
+    load_index()
+    print(f"Loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,43 @@
+import itertools
+
+import numpy as np
+
+from vote_model import compute_constraints_save, solve_final_ranks
+
+
+def brute_force_save(remaining, eliminated, j_rank):
+    '''compute_constraints_save by enumerating every vote rank permutation'''
+    m = len(j_rank)
+    solutions = [v for v in itertools.permutations(range(1, m + 1))
+                 if all(sum(v[o] > v[e] + j_rank[e] - j_rank[o] - 1 for o in remaining) <= 1 for e in eliminated)]
+    if not solutions:
+        return None, None, [[] for _ in eliminated]
+    return ([(min(v[o] for v in solutions), max(v[o] for v in solutions)) for o in remaining],
+            [(min(v[e] for v in solutions), max(v[e] for v in solutions)) for e in eliminated],
+            [sorted({o for v in solutions for o in remaining if v[o] > v[e] + j_rank[e] - j_rank[o] - 1}) for e in eliminated])
+
+
+def test_save_bounds_example():
+    lo_hi, elim_ranges, saved = compute_constraints_save([0, 1], [2, 3], [3, 4, 2, 3])
+    assert lo_hi == [(1, 2), (1, 4)]
+    assert (lo_hi, elim_ranges, saved) == brute_force_save([0, 1], [2, 3], [3, 4, 2, 3])
+
+
+def test_save_bounds_match_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        m = int(rng.integers(3, 8))
+        k = int(rng.integers(1, min(3, m - 1) + 1))
+        # permutations and tied judge ranks
+        j_rank = (rng.permutation(m) + 1 if rng.random() < 0.5 else rng.integers(1, m + 1, size=m)).tolist()
+        eliminated = sorted(rng.choice(m, k, replace=False).tolist())
+        remaining = [i for i in range(m) if i not in eliminated]
+        assert compute_constraints_save(remaining, eliminated, j_rank) == brute_force_save(remaining, eliminated, j_rank)
+
+
+def test_final_ranks_strict_and_tied():
+    # season 28 final: no strict assignment, ties going to the fan vote are feasible
+    assert solve_final_ranks([3, 2, 1, 4]) == []
+    for v in solve_final_ranks([3, 2, 1, 4], strict=False):
+        assert all(v[i] <= v[j] + [3, 2, 1, 4][j] - [3, 2, 1, 4][i] for i in range(4) for j in range(i + 1, 4))
+    assert solve_final_ranks([3, 2, 1, 4], strict=False)
@@ -1,37 +1,13 @@
-import csv
+import argparse
+import itertools
+import json
 import math
-import numpy as np
-import pandas as pd
-import cvxpy as cp      # highly unfortunate abbreviation
-import matplotlib
-import matplotlib.pyplot as plt
-
-
-SEASON = 20
-# 1: ranking, 2: percentages, 3: fuck me
-METHOD = 1 if 1 <= SEASON <= 2 else 2 if 3 <= SEASON <= 27 else 3
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 
-# read processed data
-df1 = pd.read_csv('data/season_1_2.csv', header=0)
-df2 = pd.read_csv('data/season_3_27.csv', header=0)
-df3 = pd.read_csv('data/season_28_34.csv', header=0)
-df = pd.concat([df1, df2, df3], ignore_index=True)
-column_headers = df.columns.tolist()
-
-# copy df for sorting
-season_data = df[df['season'] == SEASON].copy(deep=True)  # copying season 3
-season_data.sort_values(by='placement', inplace=True)
-print(f"Season {SEASON} Data:\n", season_data)
-print()
-
-# number of weeks season ran for
-temp_col_names = [f"week{i}_all_judge_score" for i in range(1, 12)]
-num_weeks = 11 - season_data[temp_col_names].isna().all().sum()
-num_ppl = len(season_data)     # no header
-print(f"Week Count: {num_weeks}")
-print(f"Contestants: {num_ppl}")
-print()
+from season_index import load_index, method_type
 
 
 # celebrity_name
@@ -50,20 +26,9 @@ print()
 # week[i]_percent_judge_score
 
 
-def find_cont_num(cur_week: int):  # RETURNS: current contestants, eliminations (both placements idx)
+def find_cont_num(season_data, cur_week: int):  # RETURNS: current contestants, eliminations (both placements idx)
     '''find current contestants & eliminations for that week'''
-    cur_cont_raw = season_data[season_data[f"week{cur_week}_all_judge_score"].notna()]
-    cur_cont = sorted(list(cur_cont_raw['placement']))
-    elims = []      # 1-base
-
-    if cur_week == 1:
-        elims = sorted(list(season_data[season_data[f"week{cur_week + 1}_all_judge_score"].isna()]['placement']))
-    # elif cur_week == week_cnt:
-    #     elims = sorted(list(cur_cont_raw[cur_cont_raw['placement'] != 1]['placement']))
-    else:
-        all_gone = season_data[season_data[f"week{cur_week + 1}_all_judge_score"].isna()]
-        elims = sorted(list(all_gone[all_gone[f"week{cur_week}_all_judge_score"].notna()]['placement']))
-    return cur_cont, elims
+    return season_data.contestants(cur_week), season_data.eliminations(cur_week)
 
 
 def compute_constraints_perc(cur_cont: list, elims: list, j_perc: list):
@@ -115,8 +80,125 @@ def compute_constraints_rank(cur_cont: list, elims: list, j_rank: list):
     return rank_constraints, elim_ranges
 
 
+def compute_constraints_save(remaining: list, eliminated: list, j_rank: list):
+    '''rank constraints under the judges' save (seasons 28+): each eliminated contestant e only has to be in
+    the bottom two (combined rank v + j_rank, 1 = best) --> one remaining contestant of its own, its saved partner p_e,
+    may rank below it; every other remaining o needs v_o <= v_e + j_e - j_o - 1 (same rule model_eval scores).
+
+    Every (eliminated vote ranks, partners) case is checked at once as arrays. With the eliminated ranks fixed the
+    remaining contestants only have upper bounds u_o, so with N(x) = #{o: u_o <= x}, C(x) = #{free ranks <= x}
+    a case is feasible iff the slack C - N >= 0 everywhere, and o can take the free rank f iff f <= u_o and the
+    slack is positive on [f, u_o) --> o ranges over the free ranks in (last zero slack below u_o, u_o].
+    Returns inclusive vote rank (lo, hi) bounds of the remaining contestants, exact rank ranges of the eliminated
+    ones and, per eliminated contestant, the remaining ones that can rank below it (0-base, like the inputs)'''
+    j_rank = np.asarray(j_rank, dtype=np.float64)
+    m = len(j_rank)
+    rem, el = np.asarray(remaining), np.asarray(eliminated)
+    x = np.arange(m + 1)
+
+    # every assignment of distinct vote ranks to the eliminated (assignments, k), the free ranks left (assignments, m - k)
+    ranks = np.arange(1, m + 1)
+    assigned = np.array(list(itertools.permutations(ranks, len(el))))
+    taken = (assigned[:, :, None] == ranks[None, None, :]).any(axis=1)
+    free = np.sort(np.where(taken, m + 1, ranks[None, :]), axis=1)[:, :m - len(el)]
+    free_le = np.concatenate([np.zeros((len(assigned), 1), dtype=np.int64), np.cumsum(~taken, axis=1)], axis=1)   # C(x)
+    # every choice of partner (position in rem) per eliminated contestant (partners, k)
+    partners = np.array(list(itertools.product(range(len(rem)), repeat=len(el))))
+
+    # cut[a, o, e] = v_e + j_e - j_o - 1; lifted for the partner of e --> upper[a, p, o] = min_e cut
+    cut = np.floor(assigned[:, None, :] + j_rank[el][None, None, :] - j_rank[rem][None, :, None] - 1).astype(np.int64)
+    lifted = partners[:, None, :] == np.arange(len(rem))[None, :, None]
+    upper = np.minimum(np.where(lifted[None], m, cut[:, None]).min(axis=3), m)   # (assignments, partners, remaining)
+    slack = free_le[:, None, :] - (upper[..., None] <= x).sum(axis=2)           # (assignments, partners, m + 1)
+    feasible = (slack >= 0).all(axis=2)
+
+    if not feasible.any():
+        return None, None, [[] for _ in el]
+    case, choice = np.nonzero(feasible)
+    upper, slack = upper[case, choice], slack[case, choice]
+    last_zero = np.maximum.accumulate(np.where(slack == 0, x, 0), axis=1)
+    below = np.take_along_axis(last_zero, upper - 1, axis=1)
+    lo = np.take_along_axis(free[case], np.take_along_axis(free_le[case], below, axis=1), axis=1)
+    hi = np.take_along_axis(free[case], np.take_along_axis(free_le[case], upper, axis=1) - 1, axis=1)
+
+    # p can rank below e iff some feasible case with partner p for e lets v_p exceed cut[p, e]
+    rows = np.arange(len(case))
+    saved = []
+    for e in range(len(el)):
+        p = partners[choice, e]
+        saved.append(sorted(set(rem[p[hi[rows, p] > cut[case, p, e]]].tolist())))
+    elim_ranks = assigned[case]
+    return ([(int(lo[:, o].min()), int(hi[:, o].max())) for o in range(len(rem))],
+            [(int(elim_ranks[:, e].min()), int(elim_ranks[:, e].max())) for e in range(len(el))],
+            saved)
+
+
+class FinalPercQP:
+    '''Parameterized min square sum QP for n finalists, canonicalized once and re-solved with warm starts.
+
+    The pairwise constraints v_i - v_j >= j_j - j_i (i < j) are one sparse difference-matrix
+    inequality D (v + j) >= 0 with the judge percentages j as a cp.Parameter.
+    '''
+
+    def __init__(self, n: int):
+        import cvxpy as cp      # highly unfortunate abbreviation
+        import scipy.sparse as sp
+
+        i, j = np.triu_indices(n, k=1)
+        rows = np.arange(len(i))
+        self.diff = sp.csr_matrix((np.concatenate([np.ones(len(i)), -np.ones(len(i))]), (np.concatenate([rows, rows]), np.concatenate([i, j]))), shape=(len(i), n))
+        self.vote_percs = cp.Variable(n)
+        self.j_perc = cp.Parameter(n)
+        constraints = [
+            0 <= self.vote_percs,
+            self.vote_percs <= 1,
+            cp.sum(self.vote_percs) == 1,
+        ]
+        if len(i):
+            constraints.append(self.diff @ self.vote_percs >= -(self.diff @ self.j_perc))
+        self.prob = cp.Problem(cp.Minimize(cp.sum_squares(self.vote_percs)), constraints)
+
+    def solve(self, j_perc, warm_start=True):
+        '''(vote percentages, objective), (None, None) when the problem is infeasible / unbounded'''
+        self.j_perc.value = np.asarray(j_perc, dtype=np.float64)
+        obj_value = self.prob.solve(warm_start=warm_start)
+        if self.prob.status not in ('optimal', 'optimal_inaccurate'):
+            return None, None
+        return self.vote_percs.value.tolist(), obj_value
+
+
+# one problem per finalist count, reused across seasons and bootstrap samples
+_final_perc_qps = {}
+
+
+def final_perc_qp(n: int):
+    if n not in _final_perc_qps:
+        _final_perc_qps[n] = FinalPercQP(n)
+    return _final_perc_qps[n]
+
+
 def compute_optimum_final_perc(contestants: list, j_perc: list):
     '''Runs quadratic program to find optimum for vote percentages (min square sum)'''
+    # cold start: a warm start from whichever season this process solved last changes the result by ~1e-6
+    return final_perc_qp(len(contestants)).solve(j_perc, warm_start=False)
+
+
+def compute_optimum_final_perc_batch(j_percs):
+    '''optima for a stack of judge percentage vectors (samples, n) --> (values (samples, n), objectives (samples,)),
+    NaN rows for infeasible samples'''
+    j_percs = np.atleast_2d(np.asarray(j_percs, dtype=np.float64))
+    qp = final_perc_qp(j_percs.shape[1])
+    values, objectives = np.full(j_percs.shape, np.nan), np.full(len(j_percs), np.nan)
+    for k, j_perc in enumerate(j_percs):
+        solved, obj = qp.solve(j_perc)
+        if solved is not None:
+            values[k], objectives[k] = solved, obj
+    return values, objectives
+
+
+def compute_optimum_final_perc_scalar(contestants: list, j_perc: list):
+    '''reference formulation of compute_optimum_final_perc, one scalar constraint per pair (fresh problem per call)'''
+    import cvxpy as cp
     # variable
     vote_percs = cp.Variable(len(contestants))  # 0-based
     objective = cp.Minimize(cp.sum_squares(vote_percs))
@@ -131,15 +213,79 @@ def compute_optimum_final_perc(contestants: list, j_perc: list):
     prob = cp.Problem(objective, constraints)
 
     obj_value = prob.solve()
-    var_values = vote_percs.value
-
-    for i in range(0, len(contestants)):
-        print(f"Place {i + 1} vote %: {var_values[i] * 100:.2f}")
-    print(f"Objective Value: {obj_value:.6f}")
-
-
-def compute_optimum_final_rank(contestants: list, j_rank: list):
-    '''Runs integer program to find ONE optimum for vote ranks'''
+    if prob.status not in ('optimal', 'optimal_inaccurate'):
+        return None, None
+    return vote_percs.value.tolist(), obj_value
+
+
+def _rank_domains(bounds, ranks, n):
+    '''interval domains [lo, hi] of every contestant given the ranks assigned so far (0 = unassigned)'''
+    lo, hi = np.ones(n, dtype=np.int64), np.full(n, n, dtype=np.int64)
+    assigned = np.flatnonzero(ranks)
+    if len(assigned):
+        # v_i - v_k <= bounds[i, k] --> v_k >= v_i - bounds[i, k], v_k <= v_i + bounds[k, i]
+        lo = np.maximum(lo, (ranks[assigned, None] - bounds[assigned, :]).max(axis=0))
+        hi = np.minimum(hi, (ranks[assigned, None] + bounds[:, assigned].T).min(axis=0))
+        lo[assigned] = hi[assigned] = ranks[assigned]
+    return lo, hi
+
+
+def _has_matching(lo, hi, ranks):
+    '''whether every unassigned contestant can still get a distinct free rank in its interval (greedy by hi is exact)'''
+    free = set(range(1, len(ranks) + 1)) - set(ranks[ranks > 0].tolist())
+    for k in sorted(np.flatnonzero(ranks == 0), key=lambda k: hi[k]):
+        fits = [v for v in free if lo[k] <= v <= hi[k]]
+        if not fits:
+            return False
+        free.remove(min(fits))
+    return True
+
+
+def solve_final_ranks(j_rank: list, limit=None, strict=True):
+    '''all (or the first limit) vote rank permutations with v_i <= v_j + j_rank[j] - j_rank[i] - 1 for i < j
+    (strict = False: v_i <= v_j + j_rank[j] - j_rank[i], ties go to the fan vote as in the judges' save seasons),
+    by depth-first search with interval propagation and a matching check --> list of rank lists (1-base)'''
+    n = len(j_rank)
+    j_rank = np.asarray(j_rank, dtype=np.float64)
+    # bounds[i, j]: v_i - v_j <= bounds[i, j] (inclusive); unconstrained pairs get n
+    bounds = np.full((n, n), n, dtype=np.int64)
+    i, j = np.triu_indices(n, k=1)
+    bounds[i, j] = np.floor(j_rank[j] - j_rank[i] - int(strict)).astype(np.int64)
+
+    solutions = []
+    ranks = np.zeros(n, dtype=np.int64)
+
+    def search(k):
+        if limit is not None and len(solutions) >= limit:
+            return
+        if k == n:
+            solutions.append(ranks.tolist())
+            return
+        lo, hi = _rank_domains(bounds, ranks, n)
+        if (lo > hi).any() or not _has_matching(lo, hi, ranks):
+            return
+        used = set(ranks[:k].tolist())
+        for v in range(lo[k], hi[k] + 1):
+            if v not in used:
+                ranks[k] = v
+                search(k + 1)
+                ranks[k] = 0
+
+    search(0)
+    return solutions
+
+
+def compute_optimum_final_rank(contestants: list, j_rank: list, strict=True):
+    '''finds ONE feasible assignment of vote ranks (combinatorial, no MIP solver needed)'''
+    solutions = solve_final_ranks(j_rank, limit=1, strict=strict)
+    if not solutions:
+        return None, np.inf
+    return [float(rank) for rank in solutions[0]], 0.0
+
+
+def compute_optimum_final_rank_mip(contestants: list, j_rank: list, strict=True):
+    '''Runs integer program to find ONE optimum for vote ranks (cross-check for compute_optimum_final_rank)'''
+    import cvxpy as cp
     n = len(contestants)
     # variable --> var[i][k] = 0,1 --> v_i = k
     vote_rank_bin = cp.Variable((n, n), boolean=True)
@@ -158,79 +304,171 @@ def compute_optimum_final_rank(contestants: list, j_rank: list):
             v_i = sum([(k + 1) * vote_rank_bin[i][k] for k in range(0, n)])
             v_j = sum([(k + 1) * vote_rank_bin[j][k] for k in range(0, n)])
 
-            constraints.append(v_i <= v_j + j_rank[j] - j_rank[i] - 1)      # inclusive
+            constraints.append(v_i <= v_j + j_rank[j] - j_rank[i] - int(strict))      # inclusive
     prob = cp.Problem(objective, constraints)
 
     obj_value = prob.solve()
     var_values = vote_rank_bin.value
 
+    return [float(sum([(k + 1) * var_values[i][k] for k in range(0, n)])) for i in range(0, n)], obj_value
+
+
+def solve_season(season: int, seasons=None):
+    '''weekly constraint bounds + final-week optimum for one season, as a json-ready dict'''
+    season_data = (load_index() if seasons is None else seasons)[season]
+    method = method_type(season)     # 1: ranking, 2: percentages, 3: ranking + judges' save
+    result = {
+        'season': season,
+        'method': method,
+        'num_weeks': season_data.num_weeks,
+        'contestants': [{'placement': int(place), 'name': str(name)} for place, name in zip(season_data.placement, season_data.names)],
+        'weeks': [],
+        'final': None,
+    }
+
+    # iterate through each week, 1-base
+    for cur_week in range(1, season_data.num_weeks + 1):
+        # find current contestants & eliminations
+        cur_cont, elims = find_cont_num(season_data, cur_week)
+        week = {'week': cur_week, 'contestants': cur_cont, 'eliminations': elims, 'constraints': None, 'elim_ranges': None}
+
+        # if no eliminations, no conclusions regarding vote percentages can be made
+        if len(elims) == 0:
+            result['weeks'].append(week)
+            continue
+
+        if method == 1:
+            # retrieve judge rankings, 0-base
+            j_rank = season_data.judge_rank[cur_week - 1, :elims[-1]].tolist()
+        elif method == 3:
+            # judge rankings of the contestants still in, by row position (placements can tie)
+            remaining, eliminated = season_data.positions(cur_week)
+            alive = np.sort(np.concatenate([remaining, eliminated]))
+            j_rank = season_data.judge_rank[cur_week - 1, alive].tolist()
+        elif method == 2:
+            # retrieve judge percentages, 0-base
+            j_perc = season_data.judge_perc[cur_week - 1, :elims[-1]].tolist()
+
+        # if final week --> RUN QUADRATRIC/INTEGER PROGRAM
+        if cur_week == season_data.num_weeks:
+            assert len(cur_cont) == len(elims)
+            if method == 1:
+                values, objective = compute_optimum_final_rank(elims, j_rank)
+                result['final'] = {'week': cur_week, 'vote_ranks': values, 'objective': objective,
+                                   'feasible_vote_ranks': solve_final_ranks(j_rank)}
+            elif method == 2:
+                values, objective = compute_optimum_final_perc(elims, j_perc)
+                result['final'] = {'week': cur_week, 'vote_percentages': values, 'objective': objective}
+            else:
+                # non-strict: a tie in the combined rank goes to the fan vote (scored with OP_GE in model_eval)
+                values, objective = compute_optimum_final_rank(alive, j_rank, strict=False)
+                result['final'] = {'week': cur_week, 'vote_ranks': values, 'objective': objective,
+                                   'feasible_vote_ranks': solve_final_ranks(j_rank, strict=False)}
+            # json has no inf / nan: an infeasible final is reported as null values + flag
+            result['final']['infeasible'] = values is None
+            if values is None:
+                result['final']['objective'] = None
+            break
+
+        # else (intermediate week) --> compute range for eliminated, apply constraints to remaining contestants
+        if method == 1:
+            week['constraints'], week['elim_ranges'] = compute_constraints_rank(cur_cont, elims, j_rank)
+        elif method == 2:
+            week['constraints'], week['elim_ranges'] = compute_constraints_perc(cur_cont, elims, j_perc)
+        else:
+            week['constraints'], week['elim_ranges'], saved = compute_constraints_save(
+                np.searchsorted(alive, remaining), np.searchsorted(alive, eliminated), j_rank)
+            week['saved'] = [[int(season_data.placement[alive[p]]) for p in partners] for partners in saved]
+        result['weeks'].append(week)
 
-    for i in range(0, len(contestants)):
-        vote_rank = sum([(k + 1) * var_values[i][k] for k in range(0, n)])
-        print(f"Place {i + 1} vote rank: {vote_rank}")
-
+    return result
 
-# constraints container
-vote_ranks = []         # Wk1: [v_1, ..., v_n], Wk2: [v_1, ..., v_n], ...
-vote_percentages = []   # Wk1: [p_1, ..., p_n], Wk2: [p_1, ..., p_n], ...
 
-# iterate through each week, 1-base
-for cur_week in range(1, num_weeks + 1): 
-    # find current contestants & eliminations
-    cur_cont, elims = find_cont_num(cur_week)
+def print_season(result):
+    '''human-readable report of a solve_season result'''
+    method = result['method']
+    print(f"Season {result['season']} Data:")
+    for cont in result['contestants']:
+        print(f"{cont['placement']:>3}  {cont['name']}")
+    print()
+    print(f"Week Count: {result['num_weeks']}")
+    print(f"Contestants: {len(result['contestants'])}")
+    print()
 
-    # if no eliminations, no conclusions regarding vote percentages can be made
-    if len(elims) == 0:
-        print(f"############## WEEK {cur_week} ##############")
-        print(f"Eliminations: None")
+    for week in result['weeks']:
+        print(f"############## WEEK {week['week']} ##############")
+        if len(week['eliminations']) == 0:
+            print(f"Eliminations: None")
+            print()
+            continue
+        print(f"Eliminations: {week['eliminations']}")
+        if method == 1:
+            for idx, item in enumerate(week['constraints']):
+                print(f"Place {idx + 1} vote rank min: <{item[0]}, {item[1]}>")
+            for idx, el in enumerate(week['eliminations']):
+                print(f"Place {el} vote rank range: [{week['elim_ranges'][idx][0]}, {week['elim_ranges'][idx][1]}]")
+        elif method == 2:
+            for idx, item in enumerate(week['constraints']):
+                print(f"Place {idx + 1} vote % strict min: <{f'{item[0] * 100:.2f}' if item is not None else 'N/A'}, {f'{item[1] * 100:.2f}' if item is not None else 'N/A'}>")
+            for idx, el in enumerate(week['eliminations']):
+                print(f"Place {el} vote % range: [0, {week['elim_ranges'][idx] * 100:.2f})")
+        elif week['constraints'] is None:
+            print(f"No vote ranks consistent with a judges' save")
+        else:
+            remaining = [place for place in week['contestants'] if place not in week['eliminations']]
+            for place, item in zip(remaining, week['constraints']):
+                print(f"Place {place} vote rank range: [{item[0]}, {item[1]}]")
+            for place, item in zip(week['eliminations'], week['elim_ranges']):
+                print(f"Place {place} (eliminated) vote rank range: [{item[0]}, {item[1]}]")
+            for place, partners in zip(week['eliminations'], week['saved']):
+                print(f"Place {place} possible bottom two partners: {partners}")
         print()
-        continue
-    
-    if METHOD == 1:
-        # retrieve judge rankings, 0-base
-        j_rank = list(season_data[f"week{cur_week}_rank_judge_score"].iloc[0: elims[-1]])
-    elif METHOD == 2:
-        # retrieve judge percentages, 0-base
-        j_perc = list(season_data[f"week{cur_week}_percent_judge_score"].iloc[0: elims[-1]])
-    else:
-        pass
-
-    # if final week --> RUN QUADRATRIC/INTEGER PROGRAM
-    if cur_week == num_weeks:
-        assert len(cur_cont) == len(elims)
-        print(f"############## WEEK {cur_week} ##############")
+
+    final = result['final']
+    if final is not None:
+        print(f"############## WEEK {final['week']} ##############")
         print(f"Final Week: Full Rankings")
-        if METHOD == 1:
-            vote_ranks = compute_optimum_final_rank(elims, j_rank)          # prints in function
-        elif METHOD == 2:
-            vote_percentages = compute_optimum_final_perc(elims, j_perc)    # prints in function
-        else:
-            pass
-        break
-
-    # else (intermediate week) --> compute range for eliminated, apply constraints to remaining contestants
-    if METHOD == 1:
-        rank_constraints, elim_ranges = compute_constraints_rank(cur_cont, elims, j_rank)
-        vote_ranks.append(rank_constraints)
-    elif METHOD == 2:
-        vote_constraints, elim_ranges = compute_constraints_perc(cur_cont, elims, j_perc)
-        vote_percentages.append(vote_constraints)
-    else:
-        pass
-
-    print(f"############## WEEK {cur_week} ##############")
-    print(f"Eliminations: {elims}")
-
-    if METHOD == 1:
-        for idx, item in enumerate(rank_constraints):
-            print(f"Place {idx + 1} vote rank min: <{item[0]}, {item[1]}>")
-        for idx, el in enumerate(elims):
-            print(f"Place {el} vote rank range: [{elim_ranges[idx][0]}, {elim_ranges[idx][1]}]")
-    elif METHOD == 2:
-        for idx, item in enumerate(vote_constraints):
-            print(f"Place {idx + 1} vote % strict min: <{f"{item[0] * 100:.2f}" if item is not None else "N/A"}, {f"{item[1] * 100:.2f}" if item is not None else "N/A"}>")
-        for idx, el in enumerate(elims):
-            print(f"Place {el} vote % range: [0, {elim_ranges[idx] * 100:.2f})")
-    else:
-        pass
-    print()
+        if final['infeasible']:
+            print(f"No feasible vote {'percentages' if method == 2 else 'ranks'}")
+        elif method != 2:
+            for i, vote_rank in enumerate(final['vote_ranks']):
+                print(f"Place {i + 1} vote rank: {vote_rank}")
+        elif method == 2:
+            for i, vote_perc in enumerate(final['vote_percentages']):
+                print(f"Place {i + 1} vote %: {vote_perc * 100:.2f}")
+            print(f"Objective Value: {final['objective']:.6f}")
+
+
+def solve_seasons(seasons: list, workers: int = 1):
+    '''solve_season for every season in seasons, spread across a process pool when workers > 1'''
+    index = load_index()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(solve_season, seasons, [index] * len(seasons)))
+    return [solve_season(season, index) for season in seasons]
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='weekly fan vote constraints and final-week optima per DWTS season')
+    parser.add_argument('seasons', type=int, nargs='*', default=[20], help='seasons to solve (default 20)')
+    parser.add_argument('--all', action='store_true', help='solve every season in the index')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to spread seasons across')
+    parser.add_argument('--out', type=str, default='vote_model.json', help='structured results file (json)')
+    parser.add_argument('--quiet', action='store_true', help='only write --out, skip the per-season report')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    seasons = sorted(load_index()) if args.all else args.seasons
+
+    start = time.time()
+    results = solve_seasons(seasons, workers=args.workers)
+    with open(args.out, 'w', encoding='utf-8') as file:
+        json.dump({'seasons': results}, file, indent=1, allow_nan=False)
+
+    if not args.quiet:
+        for result in results:
+            print_season(result)
+            print()
+    print(f"{len(results)} seasons written to {args.out} in {time.time() - start:.1f}s")
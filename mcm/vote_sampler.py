@@ -0,0 +1,151 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from season_index import load_index, method_type
+
+
+def week_polytope(season_data, cur_week: int, num_weeks: int):
+    '''A x <= b over the vote percentages x of the contestants alive in cur_week (placement order),
+    with sum(x) = 1 implied; returns (alive mask, A, b)'''
+    alive = season_data.alive[cur_week - 1]
+    m = int(alive.sum())
+    j_perc = season_data.judge_perc[cur_week - 1, alive]
+    # row positions --> index among the alive contestants (placements can tie, eliminated need not be the tail)
+    remaining, eliminated = (np.searchsorted(np.flatnonzero(alive), pos) for pos in season_data.positions(cur_week))
+
+    rows, bounds = [-np.eye(m)], [np.zeros(m)]      # x >= 0
+    if len(eliminated):
+        if cur_week == num_weeks:
+            # final week: x_i - x_j >= j_j - j_i for i < j
+            hi, lo = np.triu_indices(m, k=1)
+        else:
+            # remaining contestants beat each eliminated one: x_s - x_e > j_e - j_s
+            hi, lo = np.repeat(remaining, len(eliminated)), np.tile(eliminated, len(remaining))
+        pair = np.zeros((len(hi), m))
+        pair[np.arange(len(hi)), lo] = 1
+        pair[np.arange(len(hi)), hi] = -1
+        rows.append(pair)
+        bounds.append(j_perc[hi] - j_perc[lo])
+    return alive, np.vstack(rows), np.concatenate(bounds)
+
+
+def chebyshev_center(A, b):
+    '''deepest point of {A x <= b, sum(x) = 1} and its radius (<= 0: empty or flat polytope)'''
+    from scipy.optimize import linprog
+
+    m = A.shape[1]
+    # distances measured within the sum(x) = 1 plane
+    norms = np.linalg.norm(A - A.mean(axis=1, keepdims=True), axis=1)
+    res = linprog(
+        np.r_[np.zeros(m), -1.0],
+        A_ub=np.c_[A, norms], b_ub=b,
+        A_eq=np.r_[np.ones(m), 0.0][None], b_eq=[1.0],
+        bounds=[(None, None)] * m + [(0, 1)],
+    )
+    if not res.success:
+        return None, 0.0
+    return res.x[:m], res.x[m]
+
+
+def hit_and_run(A, b, x0, samples, rng, burn=200, thin=10, chains=100):
+    '''uniform samples (samples, m) of {A x <= b, sum(x) = 1} by hit-and-run, chains advanced in lockstep'''
+    m = len(x0)
+    x = np.tile(x0, (chains, 1))
+    draws = -(-samples // chains)
+    out = np.empty((draws, chains, m))
+    for step in range(burn + draws * thin):
+        # random direction within the sum(x) = 1 plane
+        d = rng.standard_normal((chains, m))
+        d -= d.mean(axis=1, keepdims=True)
+        d /= np.linalg.norm(d, axis=1, keepdims=True)
+
+        slack = np.maximum(b - x @ A.T, 0)
+        rate = d @ A.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = slack / rate
+        t_max = np.where(rate > 0, ratio, np.inf).min(axis=1)
+        t_min = np.where(rate < 0, ratio, -np.inf).max(axis=1)
+        x = x + (t_min + rng.random(chains) * (t_max - t_min))[:, None] * d
+
+        if step >= burn and (step - burn) % thin == thin - 1:
+            out[(step - burn) // thin] = x
+    return out.reshape(-1, m)[:samples]
+
+
+def sample_season(season: int, samples=1000, seed=0, burn=200, thin=10, chains=100, seasons=None):
+    '''(samples, weeks, n) vote percentages uniformly over every week's elimination polytope,
+    laid out like Season.fan (placement order, eliminated contestants 0; NaN for empty weeks);
+    only percentage seasons (method 2) have these polytopes'''
+    if method_type(season) != 2:
+        raise ValueError(f"Season {season} is scored by ranks (method {method_type(season)}), expected a percentage season")
+    season_data = (load_index() if seasons is None else seasons)[season]
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(season,)))
+    num_weeks = season_data.num_weeks
+    out = np.zeros((samples, num_weeks, season_data.num_ppl))
+
+    for cur_week in range(1, num_weeks + 1):
+        alive, A, b = week_polytope(season_data, cur_week, num_weeks)
+        x0, radius = chebyshev_center(A, b)
+        if x0 is None or radius <= 0:
+            out[:, cur_week - 1, alive] = np.nan
+            continue
+        out[:, cur_week - 1, alive] = hit_and_run(A, b, x0, samples, rng, burn, thin, chains)
+    return out
+
+
+def sample_seasons(seasons: list, workers=1, **kwargs):
+    '''{season: samples}, seasons spread across a process pool when workers > 1'''
+    index = load_index()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(sample_season, season, seasons=index, **kwargs) for season in seasons]
+            return {season: future.result() for season, future in zip(seasons, futures)}
+    return {season: sample_season(season, seasons=index, **kwargs) for season in seasons}
+
+
+def save_samples(samples: dict, path, dtype=np.float64):
+    np.savez_compressed(path, **{f"s{season}": values.astype(dtype) for season, values in samples.items()})
+
+
+def load_samples(path):
+    '''{season: (samples, weeks, n)} --> feeds model_eval.evaluate(load_index(), load_samples(path))'''
+    with np.load(path) as file:
+        return {int(key[1:]): file[key].astype(np.float64) for key in file.files}
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='hit-and-run samples of fan vote percentages consistent with every weekly elimination')
+    parser.add_argument('seasons', type=int, nargs='*', help='seasons to sample (default: all percentage seasons)')
+    parser.add_argument('--samples', type=int, default=1000, help='samples per season')
+    parser.add_argument('--burn', type=int, default=200, help='burn-in steps per chain')
+    parser.add_argument('--thin', type=int, default=10, help='steps between kept samples')
+    parser.add_argument('--chains', type=int, default=100, help='chains advanced in lockstep')
+    parser.add_argument('--seed', type=int, default=0, help='root seed (one stream per season)')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to spread seasons across')
+    parser.add_argument('--float32', action='store_true', help='store samples as float32')
+    parser.add_argument('--out', type=str, default='vote_samples.npz', help='samples file (npz, one (samples, weeks, n) array per season)')
+    parser.add_argument('--score', action='store_true', help='print the model_eval match rate of the samples')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    seasons = args.seasons or [season for season, data in load_index().items() if data.method == 2]
+    ranked = [season for season in seasons if method_type(season) != 2]
+    if ranked:
+        raise SystemExit(f"Seasons {ranked} are scored by ranks, only percentage seasons can be sampled")
+
+    start = time.time()
+    samples = sample_seasons(seasons, workers=args.workers, samples=args.samples, seed=args.seed,
+                             burn=args.burn, thin=args.thin, chains=args.chains)
+    save_samples(samples, args.out, dtype=np.float32 if args.float32 else np.float64)
+    print(f"{args.samples} samples x {len(seasons)} seasons written to {args.out} in {time.time() - start:.1f}s")
+
+    if args.score:
+        from model_eval import evaluate, season_table
+
+        rates = season_table(evaluate(load_index(), load_samples(args.out))).groupby('season')['match_rate'].agg(['mean', 'min'])
+        print(rates.to_string())
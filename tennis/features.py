@@ -0,0 +1,84 @@
+'''
+Momentum features, one column-wise expression per feature over a point-by-point DataFrame:
+- Serve: (-1)^{data['server'] - 1}
+- Victor: (-1)^{data['point_victor'] - 1} * (1 + |data['server'] - data['point_victor']|)
+- Ace: int(data['p1_ace'] + data['p2_ace'] > 0) * (-1)^{data['server'] - 1}
+- Volley: data['rally_count'] * (-1)^{data['point_victor'] - 1}
+- Distance: data['p2_distance_run'] - data['p1_distance_run']
+- Error: data['p1_unf_err'] * (data['point_victor'] - 1) + data['p2_unf_err'] * (2 - data['point_victor'])
+
+New features are added with @feature('name'); default=False keeps them out of DEFAULT_FEATURES.
+'''
+
+import numpy as np
+
+
+FEATURES = {}          # name --> (function(df) -> array, columns used)
+DEFAULT_FEATURES = []
+
+
+def feature(name, columns=(), default=True):
+    '''registers a column-wise feature function under name'''
+    def register(func):
+        FEATURES[name] = (func, tuple(columns))
+        if default:
+            DEFAULT_FEATURES.append(name)
+        return func
+    return register
+
+
+def _sign(player):
+    '''(-1)^{player - 1}: +1 for player 1, -1 for player 2'''
+    return np.power(-1, np.asarray(player, dtype=np.int64) - 1)
+
+
+@feature('serve', columns=('server',))
+def serve(df):
+    return _sign(df['server'])
+
+
+@feature('victor', columns=('server', 'point_victor'), default=False)
+def victor(df):
+    return _sign(df['point_victor']) * (1 + np.abs(np.asarray(df['server']) - np.asarray(df['point_victor'])))
+
+
+@feature('ace', columns=('server', 'p1_ace', 'p2_ace'))
+def ace(df):
+    return (np.asarray(df['p1_ace']) + np.asarray(df['p2_ace']) > 0) * _sign(df['server'])
+
+
+@feature('volley', columns=('rally_count', 'point_victor'))
+def volley(df):
+    return np.asarray(df['rally_count']) * _sign(df['point_victor'])
+
+
+@feature('distance', columns=('p1_distance_run', 'p2_distance_run'))
+def distance(df):
+    return np.asarray(df['p2_distance_run']) - np.asarray(df['p1_distance_run'])
+
+
+@feature('error', columns=('p1_unf_err', 'p2_unf_err', 'point_victor'))
+def error(df):
+    point_victor = np.asarray(df['point_victor'])
+    return np.asarray(df['p1_unf_err']) * (point_victor - 1) + np.asarray(df['p2_unf_err']) * (2 - point_victor)
+
+
+def feature_columns(names=None):
+    '''input columns needed by the named features'''
+    names = DEFAULT_FEATURES if names is None else names
+    return sorted({column for name in names for column in FEATURES[name][1]})
+
+
+def feature_matrix(df, names=None, dtype=np.float64):
+    '''(points, features) matrix of the named features (default: DEFAULT_FEATURES, in registration order)'''
+    names = DEFAULT_FEATURES if names is None else names
+    out = np.empty((len(df), len(names)), dtype=dtype)
+    for k, name in enumerate(names):
+        out[:, k] = FEATURES[name][0](df)
+    return out
+
+
+def point_features(point, names=None):
+    '''feature vector of a single point given as a mapping of column --> scalar (live feeds)'''
+    names = DEFAULT_FEATURES if names is None else names
+    return np.array([FEATURES[name][0](point) for name in names], dtype=np.float64)
@@ -0,0 +1,67 @@
+'''
+Momentum kernels over a batch of matches laid out as one concatenated point array plus offsets
+(offsets[m]:offsets[m + 1] are the points of segment m, offsets[-1] == number of points).
+Every kernel is a single np.cumsum followed by differences of it, so none of them loops over matches.
+Values may carry trailing axes (e.g. a (points, features) matrix); sums run along axis 0.
+'''
+
+import numpy as np
+
+
+def segment_offsets(*keys):
+    '''start offsets of the runs where none of keys changes (e.g. match_id, set_no, game_no), plus the total length'''
+    keys = [np.asarray(key) for key in keys]
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[:1] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.r_[np.flatnonzero(change), len(change)]
+
+
+def _prefix(values):
+    '''prefix sums with a leading zero: prefix[i] = values[:i].sum(axis=0)'''
+    values = np.asarray(values, dtype=np.float64)
+    return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+
+def _point_starts(offsets):
+    '''start offset of the segment every point belongs to'''
+    return np.repeat(offsets[:-1], np.diff(offsets))
+
+
+def segment_cumsum(values, offsets):
+    '''cumulative sum of values restarting at every offset'''
+    prefix = _prefix(values)
+    return prefix[1:] - prefix[_point_starts(offsets)]
+
+
+def cumulative_momentum(deltas, offsets=None):
+    '''running momentum from per-point deltas, restarting at every offset (default: one segment)'''
+    deltas = np.asarray(deltas, dtype=np.float64)
+    return np.cumsum(deltas, axis=0) if offsets is None else segment_cumsum(deltas, offsets)
+
+
+def segment_sums(values, offsets):
+    '''total of values over each segment --> (segments, ...)'''
+    prefix = _prefix(values)
+    return prefix[offsets[1:]] - prefix[offsets[:-1]]
+
+
+def rolling_sum(values, window, offsets):
+    '''sum over the last window points (current included), never reaching back past the point's segment start'''
+    prefix = _prefix(values)
+    end = np.arange(1, len(prefix))
+    return prefix[end] - prefix[np.maximum(end - window, _point_starts(offsets))]
+
+
+def rolling_unit_sum(values, window, unit_offsets, offsets):
+    '''sum over the current unit (game / set, up to the current point) and the window - 1 units before it,
+    never reaching back past the point's segment (match) start; unit_offsets must nest inside offsets'''
+    prefix = _prefix(values)
+    unit_lengths = np.diff(unit_offsets)
+    unit = np.repeat(np.arange(len(unit_lengths)), unit_lengths)
+    # first unit of every segment, per unit
+    first_unit = np.searchsorted(unit_offsets, offsets[:-1])
+    segment_of_unit = np.searchsorted(offsets, unit_offsets[:-1], side='right') - 1
+    window_start = unit_offsets[np.maximum(unit - window + 1, first_unit[segment_of_unit][unit])]
+    return prefix[1:] - prefix[window_start]
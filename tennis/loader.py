@@ -0,0 +1,128 @@
+'''
+Typed loading of point-by-point csvs. Column dtypes come from the data dictionary (variables, explanation, example):
+- 'H:MM:SS' times --> timedelta
+- letter codes ('F: Forehand, ...') and scores with 'AD' --> category
+- decimal examples (distances, 5.376) and unit measurements (mph) --> float32
+- integer examples (counts, flags, player numbers) --> smallest int that holds the data (int8 / int16)
+- anything else (ids, names) --> category
+Columns missing from the dictionary (derived columns such as flow_step, slope) keep the types pandas infers.
+The parsed frame is cached as a parquet sidecar next to the csv, rebuilt when the csv or dictionary changes.
+'''
+
+import argparse
+import json
+import os
+import re
+import time
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DICTIONARY_PATH = os.path.join(DATA_DIR, '2024_data_dictionary.csv')
+CACHE_VERSION = 1
+
+
+def column_kinds(dictionary_path=DICTIONARY_PATH):
+    '''{column: 'timedelta' | 'category' | 'float' | 'int'} from the data dictionary'''
+    import pandas as pd
+
+    kinds = {}
+    for row in pd.read_csv(dictionary_path, header=0, dtype=str).fillna('').itertuples():
+        example, explanation = row.example, row.explanation
+        if 'H:MM:SS' in explanation:
+            kinds[row.variables] = 'timedelta'
+        elif re.search(r'\b[A-Z]+:', example) or re.search(r'\bAD\b', example):
+            kinds[row.variables] = 'category'
+        elif re.search(r'\d\.\d', example) or re.search(r'\((meters|miles per hour)', explanation):
+            kinds[row.variables] = 'float'
+        elif re.match(r'\d+(?=[\s,.:]|$)', example):
+            kinds[row.variables] = 'int'
+        else:
+            kinds[row.variables] = 'category'
+    return kinds
+
+
+def apply_kinds(df, kinds):
+    '''casts the columns of df (in place) to the compact dtype of their kind'''
+    import pandas as pd
+
+    for column, kind in kinds.items():
+        if column not in df:
+            continue
+        if kind == 'timedelta':
+            df[column] = pd.to_timedelta(df[column])
+        elif kind == 'category':
+            df[column] = df[column].astype(str).where(df[column].notna()).astype('category')
+        elif kind == 'float':
+            df[column] = df[column].astype('float32')
+        elif df[column].isna().any():
+            df[column] = df[column].astype('float32')
+        else:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def cache_path(path):
+    return os.path.splitext(path)[0] + '.parquet'
+
+
+def _signature(path, dictionary_path):
+    '''identifies the csv and dictionary the cache was built from'''
+    stats = [os.stat(source) for source in (path, dictionary_path)]
+    return {'version': CACHE_VERSION, 'sources': [[stat.st_size, stat.st_mtime_ns] for stat in stats]}
+
+
+def read_points(path, dictionary_path=DICTIONARY_PATH):
+    '''parses a point-by-point csv with dictionary-driven dtypes (no cache)'''
+    import pandas as pd
+
+    df = pd.read_csv(path, header=0)
+    return apply_kinds(df, column_kinds(dictionary_path))
+
+
+def load_points(path, dictionary_path=DICTIONARY_PATH, rebuild=False, cache=True):
+    '''typed point-by-point DataFrame of a csv, from the parquet sidecar when it is newer than the csv / dictionary'''
+    import pyarrow.parquet as pq
+
+    sidecar, signature = cache_path(path), _signature(path, dictionary_path)
+    if cache and not rebuild and os.path.exists(sidecar):
+        table = pq.read_table(sidecar)
+        meta = (table.schema.metadata or {}).get(b'points_source')
+        if meta is not None and json.loads(meta) == signature:
+            return table.to_pandas()
+
+    df = read_points(path, dictionary_path)
+    if cache:
+        save_points(df, sidecar, signature)
+    return df
+
+
+def save_points(df, path, signature):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b'points_source': json.dumps(signature).encode()})
+    pq.write_table(table, path, compression='zstd')
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='typed load of point-by-point csvs (builds the parquet sidecar caches)')
+    parser.add_argument('paths', nargs='*', default=[os.path.join(DATA_DIR, '2024_Wimbledon_featured_matches.csv')], help='point-by-point csvs')
+    parser.add_argument('--rebuild', action='store_true', help='ignore existing sidecars')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    args = _parse_args()
+    for path in args.paths:
+        start = time.perf_counter()
+        raw = pd.read_csv(path, header=0)
+        raw_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = load_points(path, rebuild=args.rebuild)
+        load_time = time.perf_counter() - start
+        print(f"{path}: {len(df)} points, {df.memory_usage(deep=True).sum() / 1024:.0f} KiB in {load_time * 1000:.1f} ms "
+              f"(read_csv: {raw.memory_usage(deep=True).sum() / 1024:.0f} KiB in {raw_time * 1000:.1f} ms)")
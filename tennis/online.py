@@ -0,0 +1,122 @@
+import argparse
+import time
+
+import numpy as np
+
+from features import DEFAULT_FEATURES, point_features
+from pipeline import RECEIVER_WEIGHT
+
+
+class LatencyStats:
+    '''per-update latencies: running count / mean / max plus percentiles over the last window updates'''
+
+    def __init__(self, window=4096):
+        self.window = np.zeros(window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.window[self.count % len(self.window)] = seconds
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def metrics(self):
+        recent = self.window[:min(self.count, len(self.window))] * 1e6
+        return {
+            'updates': self.count,
+            'mean_us': self.total / self.count * 1e6 if self.count else 0.0,
+            'p50_us': float(np.percentile(recent, 50)) if self.count else 0.0,
+            'p99_us': float(np.percentile(recent, 99)) if self.count else 0.0,
+            'max_us': self.max * 1e6,
+        }
+
+
+class OnlineMomentum:
+    '''Live momentum for a point feed: O(1) cumulative flow / predicted momentum per point and
+    recursive least squares updates of the feature coefficients whenever a slope label arrives.
+
+    forgetting < 1 discounts old points (exponentially weighted RLS); delta scales the initial
+    coefficient covariance (large --> the first labels dominate, converging to ordinary least squares).
+    '''
+
+    def __init__(self, names=None, forgetting=1.0, delta=1e4, coef=None, intercept=0.0):
+        self.names = list(DEFAULT_FEATURES if names is None else names)
+        k = len(self.names) + 1     # + intercept
+        self.forgetting = forgetting
+        self.weights = np.zeros(k)
+        if coef is not None:
+            self.weights[:-1] = coef
+            self.weights[-1] = intercept
+        self.cov = np.eye(k) * delta
+        self.latency = LatencyStats()
+        self.reset()
+
+    def reset(self):
+        '''new match: cumulative values restart, coefficients are kept'''
+        self.points = 0
+        self.cum_flow = 0.0
+        self.momentum = 0.0
+
+    @property
+    def coef(self):
+        return self.weights[:-1]
+
+    @property
+    def intercept(self):
+        return self.weights[-1]
+
+    def _learn(self, x, slope):
+        # RLS: gain = P x / (lambda + x' P x), w += gain * error, P = (P - gain x' P) / lambda
+        px = self.cov @ x
+        gain = px / (self.forgetting + x @ px)
+        self.weights += gain * (slope - self.weights @ x)
+        self.cov = (self.cov - np.outer(gain, px)) / self.forgetting
+
+    def update(self, point, slope=None):
+        '''consume one point (mapping of column --> value) --> (predicted momentum delta, momentum, cumulative flow)'''
+        start = time.perf_counter()
+        x = np.append(point_features(point, self.names), 1.0)
+        delta = float(self.weights @ x)
+
+        self.points += 1
+        self.momentum += delta
+        won_by_p1 = point['point_victor'] == 1
+        self.cum_flow += (1.0 if won_by_p1 else -1.0) * (RECEIVER_WEIGHT if point['point_victor'] != point['server'] else 1.0)
+        if slope is not None and not np.isnan(slope):
+            self._learn(x, slope)
+
+        self.latency.add(time.perf_counter() - start)
+        return delta, self.momentum, self.cum_flow
+
+    def metrics(self):
+        return {'points': self.points, 'cum_flow': self.cum_flow, 'momentum': self.momentum, **self.latency.metrics()}
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='replay a point-by-point csv as a live feed through the online momentum engine')
+    parser.add_argument('--data', type=str, default='data/alcarez_djokovic.csv', help='point-by-point csv (slope column used as labels if present)')
+    parser.add_argument('--forgetting', type=float, default=1.0, help='RLS forgetting factor (1 = ordinary least squares)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    from loader import load_points
+
+    args = _parse_args()
+    df = load_points(args.data)
+    engine = OnlineMomentum(forgetting=args.forgetting)
+    labels = df['slope'].to_numpy() if 'slope' in df else [None] * len(df)
+
+    match_id = None
+    for point, slope in zip(df.to_dict('records'), labels):
+        if point['match_id'] != match_id:
+            match_id = point['match_id']
+            engine.reset()
+        engine.update(point, slope)
+
+    print(f"Coefficients: {engine.coef}")
+    print(f"Intercept: {engine.intercept}")
+    for key, value in engine.metrics().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
@@ -0,0 +1,106 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from features import DEFAULT_FEATURES, feature_matrix
+from kernels import cumulative_momentum, rolling_sum, segment_offsets
+from loader import load_points
+
+
+DATA_PATH = 'data/2024_Wimbledon_featured_matches.csv'
+POINT_ORDER = ['match_id', 'set_no', 'game_no', 'point_no']
+# flow step of a point won by the receiver (a point won on serve counts 1), as in alcarez_djokovic.csv
+RECEIVER_WEIGHT = 1.1731
+
+
+def flow_steps(df):
+    '''+1 / -1 for a point won by player 1 / 2, weighted by RECEIVER_WEIGHT when the receiver wins it'''
+    point_victor, server = df['point_victor'].to_numpy(), df['server'].to_numpy()
+    return np.where(point_victor == 1, 1.0, -1.0) * np.where(point_victor != server, RECEIVER_WEIGHT, 1.0)
+
+
+def fit_match(features, target):
+    '''LinearRegression of target on features for one match --> (coefficients, intercept, R^2, predictions)'''
+    from sklearn.linear_model import LinearRegression
+
+    model = LinearRegression().fit(features, target)
+    return model.coef_, model.intercept_, model.score(features, target), model.predict(features)
+
+
+def _fit_matches(features, target, offsets):
+    return [fit_match(features[start:end], target[start:end]) for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def run_pipeline(df, names=None, workers=1, window=10):
+    '''features, flow and fitted momentum of every match in df --> one point-level DataFrame'''
+    names = DEFAULT_FEATURES if names is None else names
+    df = df.sort_values(by=POINT_ORDER, kind='stable', ignore_index=True)
+    offsets = segment_offsets(df['match_id'])
+
+    features = feature_matrix(df, names)
+    steps = flow_steps(df)
+    # labels: the smoothed momentum slope where the data has it, otherwise the flow step itself
+    target = df['slope'].to_numpy(dtype=np.float64) if 'slope' in df else steps
+
+    bounds = list(zip(offsets[:-1], offsets[1:]))
+    if workers > 1:
+        # whole matches per worker
+        chunks = np.array_split(np.arange(len(bounds)), workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_fit_matches, *zip(*[
+                (features[offsets[c[0]]:offsets[c[-1] + 1]], target[offsets[c[0]]:offsets[c[-1] + 1]], offsets[c[0]:c[-1] + 2] - offsets[c[0]])
+                for c in chunks if len(c)
+            ]))
+            fits = [fit for part in parts for fit in part]
+    else:
+        fits = _fit_matches(features, target, offsets)
+
+    lengths = np.diff(offsets)
+    out = df[POINT_ORDER + ['player1', 'player2']].copy()
+    for k, name in enumerate(names):
+        out[name] = features[:, k]
+    out['flow_step'] = steps
+    out['cum_flow'] = cumulative_momentum(steps, offsets)
+    out['target'] = target
+    out['delta_pred'] = np.concatenate([fit[3] for fit in fits])
+    delta_pred = out['delta_pred'].to_numpy()
+    out['momentum_pred'] = cumulative_momentum(delta_pred, offsets)
+    # the same momentum restarted every set / game, and over the last window points of the match
+    out['momentum_set'] = cumulative_momentum(delta_pred, segment_offsets(df['match_id'], df['set_no']))
+    out['momentum_game'] = cumulative_momentum(delta_pred, segment_offsets(df['match_id'], df['set_no'], df['game_no']))
+    out[f"momentum_last{window}"] = rolling_sum(delta_pred, window, offsets)
+    # per-match fit, repeated on every point of the match (compresses to runs in the columnar file)
+    for k, name in enumerate(names):
+        out[f"coef_{name}"] = np.repeat([fit[0][k] for fit in fits], lengths)
+    out['intercept'] = np.repeat([fit[1] for fit in fits], lengths)
+    out['r2'] = np.repeat([fit[2] for fit in fits], lengths)
+    return out
+
+
+def write_results(out, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    pq.write_table(table, path, compression='zstd')
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='features, flow and per-match momentum fits for every match of a point-by-point file')
+    parser.add_argument('--data', type=str, default=DATA_PATH, help='point-by-point csv (typed, cached as a parquet sidecar)')
+    parser.add_argument('--features', nargs='+', default=None, help=f'features to fit (default: {" ".join(DEFAULT_FEATURES)})')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to fit matches across')
+    parser.add_argument('--window', type=int, default=10, help='points in the rolling momentum window')
+    parser.add_argument('--out', type=str, default='momentum.parquet', help='point-level results (parquet)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    start = time.time()
+    df = load_points(args.data)
+    out = run_pipeline(df, names=args.features, workers=args.workers, window=args.window)
+    write_results(out, args.out)
+    print(f"{out['match_id'].nunique()} matches, {len(out)} points written to {args.out} in {time.time() - start:.2f}s")
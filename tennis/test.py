@@ -7,9 +7,13 @@ import matplotlib.pyplot as plt
 import datetime
 import time
 
+from features import feature_matrix
+from kernels import cumulative_momentum
+from loader import load_points
+
 
 final_data = []
-df = pd.read_csv('data/alcarez_djokovic.csv', header=0)
+df = load_points('data/alcarez_djokovic.csv')
 
 # match_data = df[df['match_id'] == '2023-wimbledon-1701']
 # momentum_deltas = np.array([])  # momentum values derived from flow model
@@ -24,22 +28,8 @@ Features:
 - Error: data['p1_unf_err'] * (data['point_victor'] - 1) + data['p2_unf_err'] * (2 - data['point_victor'])
 '''
 
-features = []
-for idx, row in df.iterrows():
-    cur_list = [
-        np.power(-1, row['server'] - 1),                                                                    # serve
-        # np.power(-1, row['point_victor'] - 1) * (1 + np.abs(row['server'] - row['point_victor'])),          # victor
-        int(row['p1_ace'] + row['p2_ace'] > 0) * np.power(-1, row['server'] - 1),                           # ace
-        row['rally_count'] * np.power(-1, row['point_victor'] - 1),                                         # volley
-        row['p2_distance_run'] - row['p1_distance_run'],                                                    # distance
-        row['p1_unf_err'] * (row['point_victor'] - 1) + row['p2_unf_err'] * (2 - row['point_victor']),      # error
-    ]
-    features.append(cur_list)
-
-    if idx == 0:
-        print(cur_list)
-
-features = np.array(features)
+features = feature_matrix(df)
+print(features[0].tolist())
 slopes = np.array(df['slope'])
 
 model = LinearRegression().fit(features, slopes)
@@ -50,13 +40,7 @@ momentum_gold = np.array(df['cum_flow'])
 
 delta_momentum_pred = model.predict(features)
 
-momentum_pred = []
-for delta in delta_momentum_pred:
-    if len(momentum_pred) == 0:
-        momentum_pred.append(delta)
-    else:
-        momentum_pred.append(delta + momentum_pred[-1])
-momentum_pred = np.array(momentum_pred)
+momentum_pred = cumulative_momentum(delta_momentum_pred)
 
 x = np.array([i + 1 for i in range(len(slopes))])
 